@@ -0,0 +1,265 @@
+"""
+Сквозной бенчмарк: полный цикл main(test_mode=True) против локального стенда
+
+    python benchmarks/bench_e2e.py [--backend http|selenium] [--mode trustee|broad] [--rows 40] [--latency 0.2]
+                                   [--assets] [--compare benchmarks/results/прошлый.json]
+
+Стенд отдаёт страницы и JSON API fedresurs, API дел и Telegram Bot API,
+письма принимает локальный SMTP-приёмник. Результат сохраняется в
+benchmarks/results/*.json для сравнения запусков. С --assets страницы стенда ссылаются
+на стили, картинки и шрифт — для сравнения трафика браузера при PARSER_BLOCK_RESOURCES=1 и 0.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+
+from aiohttp import web  # noqa: E402
+
+from standin_server import FedresursStandin, SMTPSink, case_number  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class PeakRSS:
+    """Пиковый RSS процесса вместе с дочерними (Chrome, chromedriver), опрос в фоне"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        from parser_fedresurs import _process_tree_rss_mb
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, _process_tree_rss_mb(os.getpid()))
+            self._stop.wait(self.interval)
+
+
+class StandinThread:
+    """Стенд и SMTP-приёмник в своём потоке со своим event loop, как опрос памяти в PeakRSS:
+    их обработчики не делят цикл с main() и не искажают замеры задержек"""
+
+    def __init__(self, standin):
+        self.standin = standin
+        self.sink = SMTPSink()
+        self.port = self.smtp_port = None
+        self._ready = threading.Event()
+        self._error = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._start())
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _start(self):
+        self._runner = web.AppRunner(self.standin.make_app())
+        await self._runner.setup()
+        self.port = free_port()
+        await web.TCPSite(self._runner, '127.0.0.1', self.port).start()
+        self.smtp_port = await self.sink.start()
+
+    async def _cleanup(self):
+        await self.sink.stop()
+        await self._runner.cleanup()
+
+
+def configure_env(args, base_url, smtp_port, workdir):
+    """Переменные окружения читаются модулями при импорте — задаём их до импорта main"""
+    os.environ.update({
+        'PARSER_BACKEND': args.backend,
+        'PARSER_MODE': args.mode,
+        'FEDRESURS_URL': base_url,
+        'FEDRESURS_API_URL': f'{base_url}/backend',
+        'CASE_API_URL': f'{base_url}/api/bankrot.php',
+        'API_TOKEN': 'benchmark',
+        'TELEGRAM_API_URL': base_url,
+        'TELEGRAM_BOT_TOKEN': '123456:BENCHMARK',
+        'TELEGRAM_CHAT_ID': '1',
+        'TELEGRAM_MIN_INTERVAL': '0',
+        'SMTP_SERVER': '127.0.0.1',
+        'SMTP_PORT': str(smtp_port),
+        'SMTP_STARTTLS': '0',
+        'EMAIL': 'bench@example.com',
+        'EMAIL_PASSWORD': 'bench',
+        'EMAIL_TO': 'lots@example.com',
+        'CHECK_INTERVAL': '1',
+        'PARSER_HOST_INTERVAL': '0',
+        'PORT': str(free_port()),
+        'TRUSTEE_STATE_FILE': os.path.join(workdir, 'trustee_state.json'),
+    })
+
+
+async def run(args):
+    standin = FedresursStandin(args.rows, args.latency, assets=args.assets)
+    with StandinThread(standin) as server:
+        return await run_against(args, standin, server)
+
+
+async def run_against(args, standin, server):
+    sink = server.sink
+    workdir = tempfile.mkdtemp(prefix='bankrot-bench-')
+    configure_env(args, f'http://127.0.0.1:{server.port}', server.smtp_port, workdir)
+    os.chdir(workdir)
+    # Для широкого запроса стенд отдаёт торги всех отслеживаемых управляющих
+    from parser_common import TRUSTEE_NAMES
+    standin.trustee_names = list(TRUSTEE_NAMES)
+
+    import main
+    import metrics
+
+    # Момент обнаружения лота — постановка в обработку
+    discovered = {}
+    process_new_lot = main.process_new_lot
+
+    async def timed_process_new_lot(trustee_name, case_info, seen_cases, pipeline):
+        guid = case_info.get('guid')
+        if guid and guid not in seen_cases:
+            discovered[case_number(guid)] = time.time()
+        await process_new_lot(trustee_name, case_info, seen_cases, pipeline)
+
+    main.process_new_lot = timed_process_new_lot
+
+    started = time.perf_counter()
+    with PeakRSS() as rss:
+        await main.main(test_mode=True)
+    total = time.perf_counter() - started
+
+    # Обнаружение -> письмо, по номеру дела в теме письма
+    latencies = []
+    for received_at, subject in sink.messages:
+        number = subject.replace('Заявка на ', '', 1)
+        if number in discovered:
+            latencies.append(received_at - discovered[number])
+    latencies.sort()
+
+    scrape = {key[0]: {'count': count, 'avg_s': round(total_s / count, 4)}
+              for key, (count, total_s) in metrics.TRUSTEE_SCRAPE_SECONDS.totals().items() if count}
+    stages = {key[0]: {'count': count, 'sum_s': round(total_s, 4)}
+              for key, (count, total_s) in metrics.STAGE_SECONDS.totals().items()}
+    trades_found = sum(metrics.TRADES_FOUND.totals().values())
+    extraction_s = stages.get('extraction', stages.get('fedresurs_api', {})).get('sum_s', 0)
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'params': {
+            'backend': args.backend, 'mode': args.mode, 'rows': args.rows, 'latency': args.latency,
+            'assets': args.assets, 'block_resources': os.environ.get('PARSER_BLOCK_RESOURCES', '1') == '1',
+        },
+        'total_s': round(total, 3),
+        'scrape_per_trustee': scrape,
+        'stages': stages,
+        'trades_found': trades_found,
+        'extraction_trades_per_s': round(trades_found / extraction_s, 1) if extraction_s else None,
+        'lots_emailed': len(sink.messages),
+        'lots_discovered': len(discovered),
+        'smtp_connections': sink.connections,
+        'telegram_messages': len(standin.telegram_messages),
+        'discovery_to_email_s': {
+            'p50': round(latencies[len(latencies) // 2], 4) if latencies else None,
+            'max': round(latencies[-1], 4) if latencies else None,
+        },
+        'standin_requests': standin.requests,
+        # Трафик браузера по журналу производительности и ресурсы, отданные стендом (selenium)
+        'browser_requests': sum(metrics.PAGE_REQUESTS.totals().values()),
+        'browser_kb': round(sum(metrics.PAGE_BYTES.totals().values()) / 1024, 1),
+        'standin_asset_requests': standin.asset_requests,
+        'standin_asset_kb': round(standin.asset_bytes / 1024, 1),
+        'peak_rss_mb': round(max(rss.peak_mb, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024), 1),
+    }
+
+
+def compare(result, previous):
+    """Изменение ключевых показателей относительно прошлого запуска"""
+    keys = [
+        ('total_s', lambda r: r['total_s']),
+        ('discovery_to_email_p50_s', lambda r: r['discovery_to_email_s']['p50']),
+        ('extraction_trades_per_s', lambda r: r['extraction_trades_per_s']),
+        ('peak_rss_mb', lambda r: r['peak_rss_mb']),
+        ('browser_kb', lambda r: r.get('browser_kb')),
+    ]
+    for name, get in keys:
+        old, new = get(previous), get(result)
+        if old and new:
+            print(f"  {name}: {old} -> {new} ({(new - old) / old * 100:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backend', choices=('http', 'selenium'), default='http')
+    parser.add_argument('--mode', choices=('trustee', 'broad'), default='trustee', help='PARSER_MODE')
+    parser.add_argument('--rows', type=int, default=40, help='торгов на управляющего')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответа стенда, секунд')
+    parser.add_argument('--assets', action='store_true',
+                        help='страницы стенда со стилями, картинками и шрифтом (проверка PARSER_BLOCK_RESOURCES)')
+    parser.add_argument('--out', default=os.path.join(BENCH_DIR, 'results'))
+    parser.add_argument('--compare', help='JSON прошлого запуска')
+    args = parser.parse_args()
+    args.out = os.path.abspath(args.out)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+
+    result = asyncio.run(run(args))
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"e2e-{args.backend}-{args.mode}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(f"Сохранено в {path}")
+    if previous:
+        print("Сравнение с прошлым запуском:")
+        compare(result, previous)
+
+
+if __name__ == '__main__':
+    main()
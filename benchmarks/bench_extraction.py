@@ -0,0 +1,72 @@
+"""
+Бенчмарк извлечения строк: пакетный execute_script против поэлементного пути
+
+    python benchmarks/bench_extraction.py [--rows 100] [--repeat 5] [--page сохранённая_страница.html]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from parser_fedresurs import (  # noqa: E402
+    create_driver, extract_rows, extract_rows_per_element, collapse_rows, rows_to_trades, deduplicate_trades,
+)
+from fixtures import make_trades, render_trades_page  # noqa: E402
+
+
+def measure(func, driver, repeat):
+    timings = []
+    rows = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = func(driver)
+        timings.append(time.perf_counter() - started)
+    return rows, min(timings), sum(timings) / len(timings)
+
+
+def to_trades(rows):
+    """Торги так, как их получает парсер: без вложенных совпадений, пустых строк и повторов"""
+    return deduplicate_trades(rows_to_trades(collapse_rows(rows), ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100, help='строк на синтетической странице')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--page', help='сохранённая страница результатов вместо синтетической')
+    args = parser.parse_args()
+
+    page = args.page
+    if not page:
+        with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False, encoding='utf-8') as f:
+            f.write(render_trades_page(make_trades(args.rows)))
+            page = f.name
+
+    driver = create_driver()
+    if not driver:
+        sys.exit("Не удалось создать драйвер")
+    try:
+        driver.get('file://' + os.path.abspath(page))
+        bulk_rows, bulk_min, bulk_avg = measure(extract_rows, driver, args.repeat)
+        slow_rows, slow_min, slow_avg = measure(extract_rows_per_element, driver, args.repeat)
+    finally:
+        driver.quit()
+        if not args.page:
+            os.remove(page)
+
+    bulk_trades, slow_trades = to_trades(bulk_rows), to_trades(slow_rows)
+    print(f"Совпадений селектора: {len(bulk_rows)}, торгов: {len(bulk_trades)}")
+    print(f"execute_script: мин {bulk_min * 1000:.1f} мс, среднее {bulk_avg * 1000:.1f} мс")
+    print(f"поэлементно:    мин {slow_min * 1000:.1f} мс, среднее {slow_avg * 1000:.1f} мс")
+    print(f"Ускорение: x{slow_avg / bulk_avg:.1f}")
+    # Сырые совпадения могут отличаться текстом (innerText и .text WebDriver) — сравниваем итоговые торги
+    if bulk_trades != slow_trades:
+        print("⚠ Торги, извлечённые двумя путями, различаются")
+
+
+if __name__ == '__main__':
+    main()
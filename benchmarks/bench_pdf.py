@@ -0,0 +1,72 @@
+"""
+Бенчмарк генерации PDF-заявок: рендеров в секунду
+
+    python benchmarks/bench_pdf.py [--renders 200] [--threads 1]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from reportlab.pdfbase import pdfmetrics  # noqa: E402
+
+from pdf_template import FONT_NAME, ApplicationTemplate  # noqa: E402
+
+FONT_FILE = os.path.join(ROOT, 'SFProText-Regular.ttf')
+APPLICANT = {
+    'name': 'Иванов Иван Иванович', 'short_name': 'Иванов И.И.', 'birth': '01.01.1990',
+    'inn': '123456789012', 'ogrnip': '123456789012345', 'address': 'г. Казань, ул. Пушкина, д. 1',
+    'phone': '+79991234567', 'email': 'applicant@example.com',
+}
+
+
+def render_lot(template, i):
+    return template.render('Мурдашева Алсу Ишбулатновна', f'А65-{i}/2026', f'Должник {i}')
+
+
+def render_lot_uncached(i):
+    """Как раньше: шрифт разбирается заново, документ собирается с нуля и проходит через файл на диске"""
+    # Без этого ApplicationTemplate увидит уже зарегистрированный шрифт и не станет читать TTF
+    pdfmetrics._fonts.pop(FONT_NAME, None)
+    pdf = render_lot(ApplicationTemplate(APPLICANT, FONT_FILE), i)
+    fd, path = tempfile.mkstemp(suffix='.pdf')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf)
+        # Письмо читало заявку обратно из файла, затем файл удалялся
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--renders', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    for i in range(max(1, args.renders // 10)):
+        render_lot_uncached(i)
+    cold = max(1, args.renders // 10) / (time.perf_counter() - started)
+
+    template = ApplicationTemplate(APPLICANT, FONT_FILE)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        sizes = list(executor.map(lambda i: len(render_lot(template, i)), range(args.renders)))
+    warm = args.renders / (time.perf_counter() - started)
+
+    print(f"Без кэша шаблона: {cold:.1f} рендеров/с")
+    print(f"С кэшем шаблона ({args.threads} потоков): {warm:.1f} рендеров/с, x{warm / cold:.1f}")
+    print(f"Средний размер PDF: {sum(sizes) / len(sizes) / 1024:.1f} КБ")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Время запуска сервиса: через сколько отвечает /health и через сколько /status сообщает ready
+
+    python benchmarks/bench_startup.py [--runs 5] [--backend http|selenium]
+
+main.py запускается отдельным процессом против локального стенда (benchmarks/standin_server.py),
+после готовности процесс останавливается. Результат сохраняется в benchmarks/results/*.json.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.join(BENCH_DIR, '..')
+sys.path.insert(0, BENCH_DIR)
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+from bench_e2e import free_port  # noqa: E402
+from standin_server import FedresursStandin  # noqa: E402
+
+
+async def wait_for(session, url, check, timeout=120):
+    """Опрос url каждые 5 мс до check(ответ); время от старта цикла"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = await response.json(content_type=None) if url.endswith('/status') else None
+                    if check(data):
+                        return data
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.005)
+    raise TimeoutError(url)
+
+
+async def measure_once(args, base_url):
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix='bankrot-startup-')
+    env = dict(
+        os.environ,
+        PORT=str(port), PARSER_BACKEND=args.backend, FEDRESURS_URL=base_url,
+        FEDRESURS_API_URL=f'{base_url}/backend', CASE_API_URL=f'{base_url}/api/bankrot.php',
+        TRUSTEE_STATE_FILE=os.path.join(workdir, 'trustee_state.json'),
+    )
+    for name in ('TELEGRAM_BOT_TOKEN', 'EMAIL', 'EMAIL_PASSWORD'):
+        env.pop(name, None)
+
+    started = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(os.path.join(ROOT_DIR, 'main.py'))], cwd=workdir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=1)) as session:
+            await wait_for(session, f'http://127.0.0.1:{port}/health', lambda _: True)
+            health_s = time.monotonic() - started
+            status = await wait_for(
+                session, f'http://127.0.0.1:{port}/status', lambda data: data['startup']['state'] != 'warming'
+            )
+            ready_s = time.monotonic() - started
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return {'health_s': round(health_s, 3), 'ready_s': round(ready_s, 3), 'startup': status['startup']}
+
+
+async def run(args):
+    standin = FedresursStandin(rows=5)
+    runner = web.AppRunner(standin.make_app())
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    try:
+        runs = [await measure_once(args, f'http://127.0.0.1:{port}') for _ in range(args.runs)]
+    finally:
+        await runner.cleanup()
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'params': {'backend': args.backend, 'runs': args.runs},
+        'health_s_median': statistics.median(run['health_s'] for run in runs),
+        'ready_s_median': statistics.median(run['ready_s'] for run in runs),
+        'runs': runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backend', choices=('http', 'selenium'), default='http')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--out', default=os.path.join(BENCH_DIR, 'results'))
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"startup-{args.backend}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    for number, run_result in enumerate(result['runs'], 1):
+        print(f"Запуск {number}: /health {run_result['health_s']:.3f} с, готов {run_result['ready_s']:.3f} с, "
+              f"импорт {run_result['startup']['imports']}")
+    print(f"Медиана: /health {result['health_s_median']:.3f} с, готов {result['ready_s_median']:.3f} с")
+    print(f"Сохранено в {path}")
+
+
+if __name__ == '__main__':
+    main()
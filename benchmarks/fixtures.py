@@ -0,0 +1,79 @@
+"""
+Синтетические страницы и ответы fedresurs для бенчмарков
+Разметка повторяет селекторы, на которые опирается parser_fedresurs
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from html import escape
+
+
+DEFAULT_TRUSTEE = 'Мурдашева Алсу Ишбулатновна'
+
+# Ресурсы «тяжёлой» страницы (как у настоящего сайта): имя -> размер в байтах
+PAGE_ASSETS = {
+    'site.css': 40 * 1024,
+    'logo.png': 150 * 1024,
+    'banner.jpg': 300 * 1024,
+    'font.woff2': 80 * 1024,
+}
+
+
+def make_trades(count, trustee_name=DEFAULT_TRUSTEE, newest=None):
+    """Детерминированный список торгов, от новых к старым (по одному в день)"""
+    newest = newest or datetime(2026, 3, 31)
+    trades = []
+    for i in range(count):
+        guid = str(uuid.uuid5(uuid.NAMESPACE_URL, f'{trustee_name}/{i}'))
+        trades.append({
+            'guid': guid,
+            'trustee_name': trustee_name,
+            'debtor_name': f'Должник {i + 1}',
+            'lot_number': f'Лот № {i + 1}',
+            'description': f'Имущество должника {i + 1}',
+            'publish_date': (newest - timedelta(days=i)).strftime('%d.%m.%Y'),
+        })
+    return trades
+
+
+def render_trades_page(trades, assets=False):
+    """HTML-страница результатов поиска торгов; assets — со стилями, картинками и шрифтом из /static"""
+    rows = []
+    for trade in trades:
+        rows.append(
+            '<div class="trade-item">'
+            f'<a href="/bidding?guid={trade["guid"]}"><span class="debtor-name">{escape(trade["debtor_name"])}</span></a>'
+            f'<span class="lot-number">{escape(trade["lot_number"])}</span>'
+            f'<span class="description">{escape(trade["description"])}</span>'
+            f'<span class="date">{trade["publish_date"]}</span>'
+            f'<span class="arbitr-manager">{escape(trade["trustee_name"])}</span>'
+            '</div>'
+        )
+    if not rows:
+        rows.append('<div class="no-results">Ничего не найдено</div>')
+    head = body = ''
+    if assets:
+        head = '<link rel="stylesheet" href="/static/site.css">'
+        body = '<img src="/static/logo.png" alt=""><img src="/static/banner.jpg" alt="">'
+    return (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Торги</title>{head}</head><body>{body}'
+        '<form><input name="arbitrManager" placeholder="Арбитражный управляющий">'
+        '<button type="submit">Найти</button></form>'
+        f'<div class="trades-list">{"".join(rows)}</div>'
+        '</body></html>'
+    )
+
+
+def trades_to_api(trades):
+    """Ответ JSON API в формате, который разбирает parser_fedresurs_http"""
+    return {
+        'total': len(trades),
+        'pageData': [{
+            'guid': trade['guid'],
+            'debtor': {'name': trade['debtor_name']},
+            'lotNumber': trade['lot_number'],
+            'lotDescription': trade['description'],
+            'datePublish': datetime.strptime(trade['publish_date'], '%d.%m.%Y').isoformat(),
+            'arbitrManager': {'fio': trade['trustee_name']},
+        } for trade in trades]
+    }
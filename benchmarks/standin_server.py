@@ -0,0 +1,203 @@
+"""
+Локальный стенд для бенчмарков: fedresurs (страницы и JSON API), API дел,
+Telegram Bot API и SMTP-приёмник
+
+    python benchmarks/standin_server.py [--port 8080] [--rows 40] [--latency 0.2]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from urllib.parse import quote
+from email import message_from_bytes
+from email.header import decode_header, make_header
+
+from aiohttp import web
+
+from fixtures import PAGE_ASSETS, make_trades, render_trades_page, trades_to_api
+
+
+# Строк на страницу результатов (дальше — ссылка rel="next")
+PAGE_ROWS = 20
+
+
+def case_number(guid):
+    """Номер дела, по которому письмо сопоставляется с лотом"""
+    return f'А65-{guid[:8]}/2026'
+
+
+class FedresursStandin:
+    """
+    HTTP-стенд: rows торгов на управляющего, задержка latency секунд на каждый запрос.
+    Широкий запрос (без управляющего, с датой публикации) отдаёт торги всех trustee_names.
+    assets — страницы ссылаются на стили, картинки и шрифт (PAGE_ASSETS), отданные байты считаются.
+    Ведёт журнал запросов и сообщений Telegram.
+    """
+
+    def __init__(self, rows=40, latency=0.0, trustee_names=(), assets=False):
+        self.rows = rows
+        self.latency = latency
+        self.trustee_names = list(trustee_names)
+        self.assets = assets
+        self.asset_requests = 0
+        self.asset_bytes = 0
+        self.requests = 0
+        self.telegram_messages = []
+        self._trades = {}
+
+    def trades_for(self, trustee_name):
+        if trustee_name not in self._trades:
+            self._trades[trustee_name] = make_trades(self.rows, trustee_name)
+        return self._trades[trustee_name]
+
+    def all_trades(self, date_from=None):
+        """Торги всех управляющих с даты date_from (ГГГГ-ММ-ДД), от новых к старым"""
+        trades = [trade for name in self.trustee_names for trade in self.trades_for(name)]
+        if date_from:
+            since = datetime.strptime(date_from, '%Y-%m-%d')
+            trades = [trade for trade in trades if datetime.strptime(trade['publish_date'], '%d.%m.%Y') >= since]
+        return sorted(trades, key=lambda trade: datetime.strptime(trade['publish_date'], '%d.%m.%Y'), reverse=True)
+
+    def make_app(self):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get('/trades', self.handle_trades_page)
+        app.router.add_get('/backend/biddings', self.handle_biddings)
+        app.router.add_get('/api/bankrot.php', self.handle_case)
+        app.router.add_get('/static/{name}', self.handle_asset)
+        app.router.add_post('/bot{token}/{method}', self.handle_telegram)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    async def handle_trades_page(self, request):
+        trustee_name = request.query.get('arbitrManager') or request.query.get('search') or ''
+        date_from = request.query.get('datePublishFrom', '')
+        if not trustee_name and not date_from:
+            html = render_trades_page([], self.assets).replace('Ничего не найдено', '')
+            return web.Response(text=html, content_type='text/html')
+        page = int(request.query.get('page', 1))
+        if trustee_name:
+            trades = self.trades_for(trustee_name)
+            query = f'arbitrManager={quote(trustee_name)}'
+        else:
+            trades = self.all_trades(date_from)
+            query = f'datePublishFrom={date_from}'
+        html = render_trades_page(trades[(page - 1) * PAGE_ROWS:page * PAGE_ROWS], self.assets)
+        if page * PAGE_ROWS < len(trades):
+            next_url = f'/trades?{query}&page={page + 1}'
+            html = html.replace('</body>', f'<a rel="next" href="{next_url}">Далее</a></body>')
+        return web.Response(text=html, content_type='text/html')
+
+    async def handle_asset(self, request):
+        name = request.match_info['name']
+        if name not in PAGE_ASSETS:
+            raise web.HTTPNotFound()
+        self.asset_requests += 1
+        self.asset_bytes += PAGE_ASSETS[name]
+        if name == 'site.css':
+            body = b"@font-face { font-family: Site; src: url(/static/font.woff2); } body { font-family: Site; }"
+            body += b' ' * (PAGE_ASSETS[name] - len(body))
+            return web.Response(body=body, content_type='text/css')
+        return web.Response(body=b'\0' * PAGE_ASSETS[name], content_type='application/octet-stream')
+
+    async def handle_biddings(self, request):
+        trustee_name = request.query.get('searchString', '')
+        if trustee_name:
+            trades = self.trades_for(trustee_name)
+        else:
+            trades = self.all_trades(request.query.get('datePublishFrom'))
+        offset = int(request.query.get('offset', 0))
+        limit = int(request.query.get('limit', 50))
+        return web.json_response(trades_to_api(trades[offset:offset + limit]))
+
+    async def handle_case(self, request):
+        guid = request.query.get('guid', '')
+        return web.json_response({'rez': [{
+            'guid': {'value': guid},
+            'lastLegalCasenNumber': {'value': case_number(guid)},
+            'debtorName': {'value': f'Должник {guid[:8]}'},
+        }]})
+
+    async def handle_telegram(self, request):
+        data = await request.post()
+        self.telegram_messages.append((time.time(), data.get('text', '')))
+        return web.json_response({'ok': True, 'result': {
+            'message_id': len(self.telegram_messages),
+            'date': int(time.time()),
+            'chat': {'id': int(data.get('chat_id', 0)), 'type': 'private'},
+            'text': data.get('text', ''),
+        }})
+
+
+class SMTPSink:
+    """Минимальный SMTP-сервер без TLS и AUTH: запоминает (время, тема) каждого письма"""
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+
+    async def start(self, host='127.0.0.1', port=0):
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b'220 standin ESMTP\r\n')
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode('ascii', 'replace').strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                writer.write(b'250-standin\r\n250 8BITMIME\r\n')
+            elif command.startswith('DATA'):
+                writer.write(b'354 End data with <CR><LF>.<CR><LF>\r\n')
+                await writer.drain()
+                data = b''
+                while True:
+                    chunk = await reader.readline()
+                    if chunk in (b'.\r\n', b'.\n', b''):
+                        break
+                    data += chunk
+                subject = str(make_header(decode_header(message_from_bytes(data).get('Subject', ''))))
+                self.messages.append((time.time(), subject))
+                writer.write(b'250 OK\r\n')
+            elif command.startswith('QUIT'):
+                writer.write(b'221 Bye\r\n')
+                await writer.drain()
+                break
+            else:
+                writer.write(b'250 OK\r\n')
+            await writer.drain()
+        writer.close()
+
+
+async def _serve(args):
+    standin = FedresursStandin(args.rows, args.latency, assets=args.assets)
+    runner = web.AppRunner(standin.make_app())
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', args.port).start()
+    sink = SMTPSink()
+    smtp_port = await sink.start(port=args.smtp_port)
+    print(f"fedresurs: http://127.0.0.1:{args.port}, SMTP: 127.0.0.1:{smtp_port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--smtp-port', type=int, default=8025)
+    parser.add_argument('--rows', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--assets', action='store_true', help='страницы со стилями, картинками и шрифтом')
+    asyncio.run(_serve(parser.parse_args()))
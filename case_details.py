@@ -0,0 +1,95 @@
+"""
+Детали дела для лота: кэш с TTL на SQLite и запросы к API с повторами
+Одинаковые одновременные запросы объединяются, общий срок ожидания ограничен —
+при медленном API вызывающий код отправляет заявку по данным со страницы.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+
+class CaseCache:
+    """
+    Ответы API по GUID лота с временем получения; записи старше ttl_seconds не отдаются и удаляются при открытии.
+    Ключ — GUID лота, а не дела: getCase запрашивается по GUID лота, а номер дела
+    становится известен только из ответа, так что ключ по делу не сэкономил бы ни одного запроса.
+    """
+
+    def __init__(self, path, ttl_seconds):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cases (guid TEXT PRIMARY KEY, data TEXT NOT NULL, fetched_at REAL NOT NULL) '
+            'WITHOUT ROWID'
+        )
+        self._conn.execute('DELETE FROM cases WHERE fetched_at < ?', (time.time() - ttl_seconds,))
+
+    def get(self, guid):
+        with self._lock:
+            row = self._conn.execute('SELECT data, fetched_at FROM cases WHERE guid = ?', (guid,)).fetchone()
+        if row and row[1] >= time.time() - self.ttl_seconds:
+            return json.loads(row[0])
+        return None
+
+    def put(self, guid, data):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cases (guid, data, fetched_at) VALUES (?, ?, ?)',
+                (guid, json.dumps(data, ensure_ascii=False), time.time())
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CaseDetails:
+    """
+    fetch(guid) — корутина одного запроса к API, возвращает ответ или None.
+    get(guid) отдаёт ответ из кэша, иначе делает до 1 + retries попыток с паузой retry_delay
+    (удваивается), но не дольше deadline секунд; при неудаче — None.
+    Чтение и запись кэша (SQLite) выполняются в пуле потоков, вне event loop.
+    """
+
+    def __init__(self, fetch, cache=None, retries=2, retry_delay=1.0, deadline=30.0):
+        self.fetch = fetch
+        self.cache = cache
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.deadline = deadline
+        self._in_flight = {}
+
+    async def get(self, guid):
+        if self.cache:
+            cached = await asyncio.get_running_loop().run_in_executor(None, self.cache.get, guid)
+            if cached is not None:
+                return cached
+        # Второй запрос того же GUID ждёт результат первого
+        if guid not in self._in_flight:
+            self._in_flight[guid] = asyncio.ensure_future(self._fetch_with_retries(guid))
+            self._in_flight[guid].add_done_callback(lambda _: self._in_flight.pop(guid, None))
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._in_flight[guid]), self.deadline)
+        except asyncio.TimeoutError:
+            print(f"⚠ API дел не ответил за {self.deadline:g} с для {guid}")
+            return None
+
+    async def _fetch_with_retries(self, guid):
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(delay)
+                delay *= 2
+            data = await self.fetch(guid)
+            if data and data.get('rez'):
+                if self.cache:
+                    await asyncio.get_running_loop().run_in_executor(None, self.cache.put, guid, data)
+                return data
+        return None
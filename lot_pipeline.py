@@ -0,0 +1,69 @@
+"""
+Конвейер обработки лотов
+Каждая стадия (обогащение, уведомление, PDF, email) имеет свою очередь и свой
+лимит параллельности; лот проходит стадии строго по порядку
+"""
+
+import asyncio
+
+
+class LotPipeline:
+    """
+    Стадии задаются списком (имя, обработчик, число воркеров).
+    Обработчик — корутина handler(lot), возвращающая лот для следующей стадии
+    или None, чтобы завершить обработку лота.
+    """
+
+    def __init__(self, stages):
+        self.stages = [(name, handler, max(1, workers)) for name, handler, workers in stages]
+        self._queues = [asyncio.Queue() for _ in self.stages]
+        self._tasks = []
+        self._in_flight = set()
+
+    def start(self):
+        for index, (name, _, workers) in enumerate(self.stages):
+            for number in range(workers):
+                self._tasks.append(asyncio.create_task(self._worker(index), name=f'lot-{name}-{number}'))
+
+    def submit(self, lot):
+        """Поставить лот в очередь; False, если лот с этим GUID уже обрабатывается"""
+        if lot['guid'] in self._in_flight:
+            return False
+        self._in_flight.add(lot['guid'])
+        self._queues[0].put_nowait(lot)
+        return True
+
+    def queue_depths(self):
+        """Длины очередей стадий и число лотов в обработке"""
+        depths = {name: queue.qsize() for (name, _, _), queue in zip(self.stages, self._queues)}
+        depths['in_flight'] = len(self._in_flight)
+        return depths
+
+    async def join(self):
+        """Дождаться обработки всех поставленных лотов"""
+        for queue in self._queues:
+            await queue.join()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, index):
+        name, handler, _ = self.stages[index]
+        queue = self._queues[index]
+        while True:
+            lot = await queue.get()
+            try:
+                result = await handler(lot)
+            except Exception as e:
+                print(f"✗ Ошибка стадии {name} для лота {lot['guid']}: {e}")
+                result = None
+
+            # Передаём дальше до task_done, чтобы join() по очередям не завершился раньше времени
+            if result is not None and index + 1 < len(self._queues):
+                self._queues[index + 1].put_nowait(result)
+            else:
+                self._in_flight.discard(lot['guid'])
+            queue.task_done()
@@ -1,355 +1,736 @@
-import asyncio
-import aiohttp
-import requests
-import time
-import json
-import os
-import base64
-import re
-import smtplib
-from datetime import datetime
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-from email.header import Header
-from aiogram import Bot
-from aiogram.exceptions import TelegramBadRequest
-from aiogram.types import FSInputFile
-from dotenv import load_dotenv
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
-from reportlab.pdfbase import pdfmetrics
-from reportlab.lib import colors
-from reportlab.lib.units import cm
-from reportlab.pdfbase.ttfonts import TTFont
-from aiohttp import web
-import signal
-
-# Импорт парсера (обязательный)
-try:
-    from parser_fedresurs import get_all_trades, TRUSTEE_NAMES, MIN_DATE
-    PARSER_AVAILABLE = True
-except ImportError:
-    PARSER_AVAILABLE = False
-    print("✗ Парсер недоступен. Установите: pip install selenium webdriver-manager")
-
-
-# Загрузка переменных окружения
-load_dotenv()
-
-# Информация о заявителе
-APPLICANT_BIRTH = os.getenv('APPLICANT_BIRTH')
-SERIES = os.getenv('SERIES')
-NUMBER = os.getenv('NUMBER')
-APPLICANT_RES_ADDRESS = os.getenv('APPLICANT_RES_ADDRESS')
-APPLICANT_INN = os.getenv('APPLICANT_INN')
-APPLICANT_OGRNIP = os.getenv('APPLICANT_OGRNIP')
-OGRNIP_BIRTH = os.getenv('OGRNIP_BIRTH')
-APPLICANT_PHONE = os.getenv('APPLICANT_PHONE')
-APPLICANT_EMAIL = os.getenv('APPLICANT_EMAIL')
-
-# Настройки
-API_URL = 'https://api-cloud.ru/api/bankrot.php'
-TOKEN = os.getenv('API_TOKEN')
-SEEN_FILE = 'seen_cases.json'
-PENDING_LOTS_FILE = 'pending_lots.json'
-TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
-TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
-EMAIL_FROM = os.getenv('EMAIL_FROM')
-EMAIL = os.getenv('EMAIL')
-EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
-EMAIL_TO = os.getenv('EMAIL_TO')
-SMTP_SERVER = 'connect.smtp.bz'
-SMTP_PORT = 587
-TIMEOUT = 120
-
-# Функция для загрузки просмотренных дел
-def load_seen_cases():
-    if os.path.exists(SEEN_FILE):
-        with open(SEEN_FILE, 'r') as f:
-            return json.load(f)
-    return []
-
-# Функция для сохранения просмотренных дел
-def save_seen_cases(seen_cases):
-    with open(SEEN_FILE, 'w') as f:
-        json.dump(seen_cases, f)
-
-# Функция для загрузки ожидающих лотов
-def load_pending_lots():
-    if os.path.exists(PENDING_LOTS_FILE):
-        with open(PENDING_LOTS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-# Функция для сохранения ожидающих лотов
-def save_pending_lots(pending_lots):
-    with open(PENDING_LOTS_FILE, 'w') as f:
-        json.dump(pending_lots, f)
-
-
-
-# Асинхронная функция для получения деталей дела
-async def get_case_details_async(session, guid):
-    params = {
-        'token': TOKEN,
-        'type': 'getCase',
-        'guid': guid
-    }
-    try:
-        async with session.get(API_URL, params=params, timeout=TIMEOUT) as response:
-            if response.status == 200:
-                return await response.json()
-            return None
-    except Exception as e:
-        print(f"Ошибка получения деталей для {guid}: {e}")
-        return None
-
-# Функция для отправки сообщения в Telegram
-async def send_to_telegram(message):
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        print("Telegram не настроен")
-        return
-    
-    try:
-        bot = Bot(token=TELEGRAM_BOT_TOKEN)
-        await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
-        print(f"✓ Отправлено в Telegram: {message[:50]}...")
-    except TelegramBadRequest as e:
-        print(f"✗ Ошибка Telegram: {e}")
-    except Exception as e:
-        print(f"✗ Ошибка отправки в Telegram: {e}")
-
-# Функция для генерации PDF
-def generate_pdf(trustee_name, case_info):
-    pdfmetrics.registerFont(TTFont('SFPro', 'SFProText-Regular.ttf'))
-    
-    doc = SimpleDocTemplate("Заявка.pdf", pagesize=letter)
-    styles = getSampleStyleSheet()
-    
-    # Создаем стили с поддержкой русского языка
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontName='SFPro',
-        fontSize=16,
-        alignment=TA_CENTER,
-        spaceAfter=30
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontName='SFPro',
-        fontSize=11,
-        leading=14
-    )
-    
-    story = []
-    
-    # Заголовок
-    story.append(Paragraph("ЗАЯВКА", title_style))
-    story.append(Spacer(1, 20))
-    
-    # Информация о лоте
-    lot_number = case_info.get('lastLegalCasenNumber', {}).get('value', 'N/A')
-    debtor_name = case_info.get('debtorName', {}).get('value', 'N/A')
-    
-    story.append(Paragraph(f"<b>Лот №:</b> {lot_number}", normal_style))
-    story.append(Paragraph(f"<b>Должник:</b> {debtor_name}", normal_style))
-    story.append(Paragraph(f"<b>Управляющий:</b> {trustee_name}", normal_style))
-    story.append(Spacer(1, 20))
-    
-    # Информация о заявителе
-    story.append(Paragraph("<b>ИНФОРМАЦИЯ О ЗАЯВИТЕЛЕ:</b>", normal_style))
-    story.append(Paragraph(f"ФИО: Хисматова Эльвира Василовна", normal_style))
-    story.append(Paragraph(f"Дата рождения: {APPLICANT_BIRTH or 'N/A'}", normal_style))
-    story.append(Paragraph(f"ИНН: {APPLICANT_INN or 'N/A'}", normal_style))
-    story.append(Paragraph(f"ОГРНИП: {APPLICANT_OGRNIP or 'N/A'}", normal_style))
-    story.append(Paragraph(f"Адрес: {APPLICANT_RES_ADDRESS or 'N/A'}", normal_style))
-    story.append(Paragraph(f"Телефон: {APPLICANT_PHONE or 'N/A'}", normal_style))
-    story.append(Paragraph(f"Email: {APPLICANT_EMAIL or 'N/A'}", normal_style))
-    story.append(Spacer(1, 20))
-    
-    # Подпись
-    story.append(Paragraph("___________________ / Хисматова Э.В.", normal_style))
-    
-    doc.build(story)
-    return "Заявка.pdf"
-
-# Функция для отправки email
-def send_email(subject, attachment_path):
-    if not all([EMAIL, EMAIL_PASSWORD, EMAIL_TO]):
-        print("Email не настроен")
-        return False
-    
-    msg = MIMEMultipart()
-    msg['From'] = EMAIL_FROM or EMAIL
-    msg['To'] = EMAIL_TO
-    msg['Subject'] = Header(subject, 'utf-8')
-    
-    body = f"Заявка на участие в торгах.\n\nДата: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
-    msg.attach(MIMEText(body, 'plain', 'utf-8'))
-    
-    try:
-        with open(attachment_path, 'rb') as f:
-            part = MIMEBase('application', 'octet-stream')
-            part.set_payload(f.read())
-            encoders.encode_base64(part)
-            part.add_header(
-                'Content-Disposition',
-                f'attachment; filename="{os.path.basename(attachment_path)}"'
-            )
-            msg.attach(part)
-    except Exception as e:
-        print(f"Ошибка прикрепления файла: {e}")
-        return False
-    
-    try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL, EMAIL_PASSWORD)
-        server.sendmail(EMAIL_FROM or EMAIL, EMAIL_TO, msg.as_string())
-        server.quit()
-        print("✓ Email отправлен")
-        return True
-    except Exception as e:
-        print(f"✗ Ошибка отправки email: {e}")
-        return False
-
-# Функция для обработки нового лота
-async def process_new_lot(session, trustee_name, case_info, seen_cases):
-    try:
-        guid = case_info.get('guid', {}).get('value') or case_info.get('guid')
-        if not guid:
-            print("⚠ Нет GUID для лота")
-            return
-        
-        if guid in seen_cases:
-            return
-        
-        seen_cases.append(guid)
-        
-        # Получаем детали через API если нужно
-        if 'lastLegalCasenNumber' not in case_info:
-            details = await get_case_details_async(session, guid)
-            if details and 'rez' in details:
-                case_info = details['rez'][0]
-        
-        lot_number = case_info.get('lastLegalCasenNumber', {}).get('value', 'N/A')
-        message = f"Новый лот от {trustee_name}: {lot_number}"
-        print(f"🎯 {message}")
-        
-        # Отправляем уведомления
-        await send_to_telegram(message)
-        
-        # Генерируем и отправляем PDF
-        pdf_path = generate_pdf(trustee_name, case_info)
-        subject = f"Заявка на {lot_number}"
-        send_email(subject, pdf_path)
-        
-        # Удаляем временный файл
-        if os.path.exists(pdf_path):
-            os.remove(pdf_path)
-            
-    except Exception as e:
-        print(f"Ошибка обработки лота: {e}")
-
-async def run_http_server():
-    app = web.Application()
-    app.router.add_get('/health', handle_health)
-    app.router.add_get('/status', handle_status)
-    app.router.add_get('/', handle_health)  # Корневой путь тоже отдаём статус
-    
-    port = int(os.environ.get('PORT', 10000))
-    runner = web.AppRunner(app)
-    await runner.setup()
-    site = web.TCPSite(runner, '0.0.0.0', port)
-    await site.start()
-    print(f"✓ HTTP сервер запущен на порту {port} для Render health checks")
-    return runner
-
-# Основной цикл с использованием парсера
-async def main(test_mode=False):
-    print("=== BankrotParser v1.1 ===")
-    print("=== Запуск с использованием парсера fedresurs.ru ===")
-    
-    # Запускаем HTTP сервер для Render
-    http_runner = await run_http_server()
-    
-    if not PARSER_AVAILABLE:
-        print("✗ Парсер недоступен. Установите зависимости: pip install selenium webdriver-manager")
-        # Держим сервер запущенным даже без парсера, чтобы Render не падал
-        while True:
-            await asyncio.sleep(10)
-        return
-    
-    print(f"Дата фильтра: не ранее {MIN_DATE.strftime('%d.%m.%Y')}")
-    print(f"Управляющие: {len(TRUSTEE_NAMES)}")
-    
-    seen_cases = load_seen_cases()
-    
-    # Обработка сигналов завершения
-    loop = asyncio.get_running_loop()
-    stop_signal = asyncio.Event()
-    
-    def signal_handler():
-        print("\n⚠️ Получен сигнал завершения, останавливаемся...")
-        stop_signal.set()
-    
-    for sig in (signal.SIGTERM, signal.SIGINT):
-        loop.add_signal_handler(sig, signal_handler)
-    
-    async with aiohttp.ClientSession() as session:
-        iterations = 0
-        
-        while not stop_signal.is_set():
-            print(f"\n--- Итерация {iterations + 1} ---")
-            
-            # Получаем торги через парсер
-            try:
-                trades = get_all_trades()
-                print(f"Найдено {len(trades)} торгов")
-                
-                for trade in trades:
-                    await process_new_lot(session, trade['trustee_name'], trade, seen_cases)
-                    
-            except Exception as e:
-                print(f"Ошибка парсера: {e}")
-            
-            save_seen_cases(seen_cases)
-            
-            iterations += 1
-            if test_mode and iterations >= 2:
-                break
-            
-            # Проверка с возможностью досрочного выхода
-            for _ in range(300):  # 300 секунд с проверкой stop_signal
-                if stop_signal.is_set():
-                    break
-                await asyncio.sleep(1)
-    
-    # Очистка перед выходом
-    await http_runner.cleanup()
-    print("✅ Сервис остановлен")
-
-async def handle_health(request):
-    return web.Response(text="BankrotParser is running")
-
-async def handle_status(request):
-    return web.json_response({
-        "status": "running",
-        "service": "BankrotParser",
-        "parser_available": PARSER_AVAILABLE
-    })
-
-
-# Точка входа
-if __name__ == '__main__':
-    import sys
-    
-    test_mode = '--test' in sys.argv
-    asyncio.run(main(test_mode=test_mode))
+import asyncio
+import aiohttp
+import time
+import json
+import os
+import base64
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.mime.base import MIMEBase
+from email import encoders
+from email.header import Header
+from smtp_client import SMTPClient
+from dotenv import load_dotenv
+from aiohttp import web
+import signal
+import socket
+import importlib
+import sqlite3
+from seen_store import SeenStore, LotClaims, lot_key, is_fingerprint
+from lot_pipeline import LotPipeline
+from outbox import Outbox
+from case_details import CaseCache, CaseDetails
+from trade_history import TradeHistory, TRADE_HISTORY_DB
+from scheduler import PollScheduler
+from sharding import SHARD_INDEX, SHARD_COUNT, shard_trustees, shard_path
+import metrics
+from metrics import (
+    STAGE_SECONDS, NEW_LOTS, DUPLICATES, DELIVERIES, LAST_SUCCESSFUL_SCRAPE, SEEN_STORE_SIZE, QUEUE_DEPTH,
+    LOT_CLAIMS_TOTAL, OUTBOX_PENDING
+)
+
+# Отсчёт времени запуска: тяжёлые модули (selenium, aiogram, reportlab) импортируются
+# в фоне уже после старта HTTP-сервера, см. load_parsers() и load_delivery()
+PROCESS_STARTED = time.monotonic()
+STARTUP = {'state': 'warming', 'health_ready_s': None, 'ready_s': None, 'delivery_ready_s': None, 'imports': {}}
+# Завершатся, когда загружены модули доставки: PDF (reportlab) ждут render и email,
+# Telegram (aiogram, импорт дольше) — только отправка уведомлений
+PDF_LOADED = TELEGRAM_LOADED = None
+# Уведомления, ожидающие загрузки aiogram; при остановке их дожидаемся
+NOTIFY_TASKS = set()
+
+PARSER_AVAILABLE = None
+HTTP_PARSER_AVAILABLE = SELENIUM_AVAILABLE = False
+stream_trades = stream_trades_http = get_driver_pool = close_driver_pool = None
+stream_trades_broad = stream_trades_broad_http = None
+is_blank = None
+TRUSTEE_NAMES = []
+MIN_DATE = None
+BROAD_STATE_KEY = None
+
+
+# Загрузка переменных окружения
+load_dotenv()
+
+# Информация о заявителе
+APPLICANT_BIRTH = os.getenv('APPLICANT_BIRTH')
+SERIES = os.getenv('SERIES')
+NUMBER = os.getenv('NUMBER')
+APPLICANT_RES_ADDRESS = os.getenv('APPLICANT_RES_ADDRESS')
+APPLICANT_INN = os.getenv('APPLICANT_INN')
+APPLICANT_OGRNIP = os.getenv('APPLICANT_OGRNIP')
+OGRNIP_BIRTH = os.getenv('OGRNIP_BIRTH')
+APPLICANT_PHONE = os.getenv('APPLICANT_PHONE')
+APPLICANT_EMAIL = os.getenv('APPLICANT_EMAIL')
+
+# Настройки
+API_URL = os.getenv('CASE_API_URL', 'https://api-cloud.ru/api/bankrot.php')
+TOKEN = os.getenv('API_TOKEN')
+SEEN_FILE = 'seen_cases.json'
+# Локальные файлы состояния: при SHARD_COUNT > 1 у каждого шарда свои (суффикс .shardN)
+SEEN_DB = os.getenv('SEEN_DB', shard_path('seen_cases.db'))
+# Общее хранилище захвата лотов для нескольких шардов (SHARD_COUNT > 1)
+LOT_CLAIMS_DB = os.getenv('LOT_CLAIMS_DB', 'lot_claims.db')
+CLAIM_LEASE_SECONDS = int(os.getenv('CLAIM_LEASE_SECONDS', '900'))
+PENDING_LOTS_FILE = os.getenv('PENDING_LOTS_FILE', shard_path('pending_lots.json'))
+TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+# Другой адрес Bot API (локальный сервер или стенд бенчмарка)
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL')
+# Пауза между сообщениями в чат и окно объединения лотов в дайджест (0 — без дайджеста), секунд
+TELEGRAM_MIN_INTERVAL = float(os.getenv('TELEGRAM_MIN_INTERVAL', '1'))
+TELEGRAM_DIGEST_WINDOW = float(os.getenv('TELEGRAM_DIGEST_WINDOW', '0'))
+EMAIL_FROM = os.getenv('EMAIL_FROM')
+EMAIL = os.getenv('EMAIL')
+EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
+EMAIL_TO = os.getenv('EMAIL_TO')
+SMTP_SERVER = os.getenv('SMTP_SERVER', 'connect.smtp.bz')
+SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', '1') == '1'
+# API дел: таймаут одного запроса, повторы, общий срок ожидания и число соединений, секунд
+CASE_API_TIMEOUT = float(os.getenv('CASE_API_TIMEOUT', '10'))
+CASE_API_RETRIES = int(os.getenv('CASE_API_RETRIES', '2'))
+CASE_API_DEADLINE = float(os.getenv('CASE_API_DEADLINE', '30'))
+CASE_API_CONNECTIONS = int(os.getenv('CASE_API_CONNECTIONS', '4'))
+# Кэш ответов API дел между запусками
+CASE_CACHE_DB = os.getenv('CASE_CACHE_DB', 'case_cache.db')
+CASE_CACHE_TTL_HOURS = float(os.getenv('CASE_CACHE_TTL_HOURS', '24'))
+# Пауза между итерациями, секунд
+CHECK_INTERVAL = int(os.getenv('CHECK_INTERVAL', '300'))
+# Параллельность стадий обработки лотов
+ENRICH_WORKERS = int(os.getenv('ENRICH_WORKERS', '4'))
+NOTIFY_WORKERS = int(os.getenv('NOTIFY_WORKERS', '2'))
+RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', '2'))
+EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', '1'))
+# Источник торгов: selenium (браузер) или http (JSON API, Selenium как запасной вариант)
+PARSER_BACKEND = os.getenv('PARSER_BACKEND', 'selenium')
+# trustee — поиск по каждому управляющему, broad — широкий запрос по всем новым торгам раз в CHECK_INTERVAL
+PARSER_MODE = os.getenv('PARSER_MODE', 'trustee')
+
+# Текущий конвейер обработки лотов и состояние итерации (для /status и /metrics)
+LOT_PIPELINE = None
+SEEN_CASES = None
+SCHEDULER = None
+LOT_CLAIMS = None
+OUTBOX = None
+ITERATION_STATUS = {
+    'iteration': 0,
+    'state': 'starting',
+    'started_at': None,
+    'trustees_done': 0,
+    'trades_found': 0,
+    'new_lots': 0,
+    'last_success_at': None,
+}
+
+# Функция для загрузки просмотренных дел (старый seen_cases.json переносится один раз)
+def load_seen_cases():
+    seen_cases = SeenStore(SEEN_DB)
+    seen_cases.migrate_json(SEEN_FILE)
+    return seen_cases
+
+# Функция для обслуживания просмотренных дел: записи уже на диске, удаляем лоты,
+# которые фильтр MIN_DATE уже не пропустит (иначе лот с первой страницы снова стал бы новым)
+def save_seen_cases(seen_cases):
+    min_date = MIN_DATE.strftime('%Y-%m-%d')
+    evicted = seen_cases.evict_published_before(min_date)
+    if LOT_CLAIMS:
+        evicted += LOT_CLAIMS.evict_published_before(min_date)
+    if evicted:
+        print(f"Удалено {evicted} устаревших записей о лотах")
+
+# Функция для загрузки ожидающих лотов
+def load_pending_lots():
+    if os.path.exists(PENDING_LOTS_FILE):
+        with open(PENDING_LOTS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+# Функция для сохранения ожидающих лотов (через временный файл, чтобы не оставить обрезанный JSON)
+def save_pending_lots(pending_lots):
+    tmp_path = PENDING_LOTS_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(pending_lots, f, ensure_ascii=False)
+    os.replace(tmp_path, PENDING_LOTS_FILE)
+
+# Каналы доставки, которые настроены
+def delivery_channels():
+    channels = []
+    if TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID:
+        channels.append('telegram')
+    if EMAIL and EMAIL_PASSWORD and EMAIL_TO:
+        channels.append('email')
+    return channels
+
+# Захват лота в общем SQLite (ожидание блокировки до 30 с) — вне event loop
+async def claim_lot(guid, lot, publish_date=None):
+    return await asyncio.get_running_loop().run_in_executor(None, LOT_CLAIMS.claim, guid, lot, publish_date)
+
+# Повтор доставки из outbox; в режиме шардов аренда лота продлевается (или лот уже забрал другой шард)
+async def retry_lot(lot, pipeline):
+    if LOT_CLAIMS and not await claim_lot(lot['guid'], lot):
+        print(f"Лот {lot['guid']} уже обрабатывается другим шардом")
+        OUTBOX.discard(lot['guid'])
+        return
+    pipeline.submit(lot)
+
+# Отметки о выполнении, ещё не записанные в хранилище захватов; при остановке их дожидаемся
+CLAIM_COMPLETIONS = set()
+
+# Лот доставлен по всем каналам — в режиме шардов отмечаем его выполненным (в пуле потоков)
+def complete_lot(guid):
+    if LOT_CLAIMS:
+        future = asyncio.get_running_loop().run_in_executor(None, LOT_CLAIMS.complete, guid)
+        CLAIM_COMPLETIONS.add(future)
+        future.add_done_callback(CLAIM_COMPLETIONS.discard)
+
+
+
+# Асинхронная функция для получения деталей дела
+async def get_case_details_async(session, guid):
+    params = {
+        'token': TOKEN,
+        'type': 'getCase',
+        'guid': guid
+    }
+    try:
+        with STAGE_SECONDS.time(stage='case_api'):
+            async with session.get(API_URL, params=params, timeout=CASE_API_TIMEOUT) as response:
+                if response.status == 200:
+                    return await response.json()
+                return None
+    except Exception as e:
+        print(f"Ошибка получения деталей для {guid}: {e}")
+        return None
+
+# Один отправитель Telegram на процесс
+TELEGRAM_SENDER = None
+
+def get_telegram_sender():
+    global TELEGRAM_SENDER
+    if TELEGRAM_SENDER is None:
+        from telegram_sender import TelegramSender
+        TELEGRAM_SENDER = TelegramSender(
+            TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
+            min_interval=TELEGRAM_MIN_INTERVAL, digest_window=TELEGRAM_DIGEST_WINDOW, api_url=TELEGRAM_API_URL
+        )
+    return TELEGRAM_SENDER
+
+# Функция для отправки сообщения в Telegram: ставит в очередь, future завершится после доставки
+def submit_to_telegram(message):
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        print("Telegram не настроен")
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(False)
+        return future
+    future = get_telegram_sender().submit(message)
+    future.add_done_callback(
+        lambda f: DELIVERIES.inc(channel='telegram', result='ok' if not f.cancelled() and f.result() else 'error')
+    )
+    return future
+
+async def send_to_telegram(message):
+    return await submit_to_telegram(message)
+
+# Шаблон заявки: шрифт, стили и блок заявителя готовятся один раз
+PDF_TEMPLATE = None
+PDF_FILENAME = "Заявка.pdf"
+
+def get_pdf_template():
+    global PDF_TEMPLATE
+    if PDF_TEMPLATE is None:
+        from pdf_template import ApplicationTemplate
+        PDF_TEMPLATE = ApplicationTemplate({
+            'name': 'Хисматова Эльвира Василовна',
+            'short_name': 'Хисматова Э.В.',
+            'birth': APPLICANT_BIRTH,
+            'inn': APPLICANT_INN,
+            'ogrnip': APPLICANT_OGRNIP,
+            'address': APPLICANT_RES_ADDRESS,
+            'phone': APPLICANT_PHONE,
+            'email': APPLICANT_EMAIL,
+        })
+    return PDF_TEMPLATE
+
+# Функция для генерации PDF: возвращает содержимое файла
+# (case_info — ответ API дел, а если он недоступен — торг со страницы)
+def generate_pdf(trustee_name, case_info):
+    lot_number = case_info.get('lastLegalCasenNumber', {}).get('value') or case_info.get('lot_number') or 'N/A'
+    debtor_name = case_info.get('debtorName', {}).get('value') or case_info.get('debtor_name') or 'N/A'
+    with STAGE_SECONDS.time(stage='pdf'):
+        return get_pdf_template().render(trustee_name, lot_number, debtor_name)
+
+# Одно SMTP-соединение на процесс: письма подряд не повторяют STARTTLS и вход
+SMTP_CLIENT = None
+
+def get_smtp_client():
+    global SMTP_CLIENT
+    if SMTP_CLIENT is None:
+        SMTP_CLIENT = SMTPClient(SMTP_SERVER, SMTP_PORT, EMAIL, EMAIL_PASSWORD, starttls=SMTP_STARTTLS)
+    return SMTP_CLIENT
+
+# Функция для отправки email
+def send_email(subject, attachment, filename=PDF_FILENAME):
+    if not all([EMAIL, EMAIL_PASSWORD, EMAIL_TO]):
+        print("Email не настроен")
+        return False
+    
+    msg = MIMEMultipart()
+    msg['From'] = EMAIL_FROM or EMAIL
+    msg['To'] = EMAIL_TO
+    msg['Subject'] = Header(subject, 'utf-8')
+    
+    body = f"Заявка на участие в торгах.\n\nДата: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
+    msg.attach(MIMEText(body, 'plain', 'utf-8'))
+    
+    try:
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(attachment)
+        encoders.encode_base64(part)
+        part.add_header(
+            'Content-Disposition',
+            f'attachment; filename="{filename}"'
+        )
+        msg.attach(part)
+    except Exception as e:
+        print(f"Ошибка прикрепления файла: {e}")
+        return False
+    
+    try:
+        with STAGE_SECONDS.time(stage='smtp'):
+            get_smtp_client().send(EMAIL_FROM or EMAIL, EMAIL_TO, msg.as_string())
+        print("✓ Email отправлен")
+        DELIVERIES.inc(channel='email', result='ok')
+        return True
+    except Exception as e:
+        print(f"✗ Ошибка отправки email: {e}")
+        DELIVERIES.inc(channel='email', result='error')
+        return False
+
+# Функция для обработки нового лота: дедупликация и постановка в конвейер
+async def process_new_lot(trustee_name, case_info, seen_cases, pipeline):
+    try:
+        # Лот без GUID дедуплицируется по отпечатку содержимого строки — если по содержимому его можно опознать
+        if is_blank(case_info):
+            print(f"⚠ Нет GUID для лота от {trustee_name}, пропускаем")
+            return
+        guid = lot_key(case_info)
+        if guid in seen_cases:
+            DUPLICATES.inc()
+            return
+        
+        lot = {'guid': guid, 'trustee_name': trustee_name, 'case_info': case_info}
+        publish_date = case_info.get('publish_date')
+        # В режиме шардов лот обрабатывает только захвативший его экземпляр
+        if LOT_CLAIMS and not await claim_lot(guid, lot, publish_date):
+            print(f"Лот {guid} уже обрабатывается другим шардом")
+            LOT_CLAIMS_TOTAL.inc(result='taken')
+            seen_cases.add(guid, publish_date)
+            return
+        
+        seen_cases.add(guid, publish_date)
+        NEW_LOTS.inc()
+        ITERATION_STATUS['new_lots'] += 1
+        # Сначала на диск, затем в конвейер: недоставленное переживёт сбой и перезапуск
+        OUTBOX.add(lot, delivery_channels())
+        pipeline.submit(lot)
+            
+    except Exception as e:
+        print(f"Ошибка обработки лота: {e}")
+
+# Конвейер обработки лотов: обогащение -> Telegram -> PDF -> email
+def build_lot_pipeline(session, case_cache=None):
+    loop = asyncio.get_running_loop()
+    pdf_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix='pdf')
+    email_executor = ThreadPoolExecutor(max_workers=EMAIL_WORKERS, thread_name_prefix='smtp')
+    case_details = CaseDetails(
+        lambda guid: get_case_details_async(session, guid), case_cache,
+        retries=CASE_API_RETRIES, deadline=CASE_API_DEADLINE
+    )
+    
+    # Получаем детали через API если нужно (из кэша, с повторами; если API не ответил — по данным со страницы)
+    async def enrich(lot):
+        # Для лота без GUID запросить API дел не по чему — заявка сразу по данным со страницы
+        if 'lastLegalCasenNumber' not in lot['case_info'] and not is_fingerprint(lot['guid']):
+            details = await case_details.get(lot['guid'])
+            if details:
+                lot['case_info'] = details['rez'][0]
+            else:
+                print(f"⚠ Нет деталей дела для {lot['guid']}, заявка по данным со страницы")
+        case_info = lot['case_info']
+        lot['lot_number'] = (
+            case_info.get('lastLegalCasenNumber', {}).get('value') or case_info.get('lot_number') or 'N/A'
+        )
+        OUTBOX.update_lot(lot)
+        return lot
+    
+    # Уведомление уходит, когда загружен aiogram; конвейер его не ждёт
+    async def send_notification(guid, message):
+        try:
+            await TELEGRAM_LOADED
+            ok = await submit_to_telegram(message)
+        except Exception as e:
+            print(f"✗ Ошибка отправки в Telegram: {e}")
+            ok = False
+        OUTBOX.finish(guid, 'telegram', ok)
+    
+    # Отправляем уведомления (не дожидаясь доставки, чтобы не задерживать заявку)
+    async def notify(lot):
+        message = f"Новый лот от {lot['trustee_name']}: {lot['lot_number']}"
+        print(f"🎯 {message}")
+        if OUTBOX.is_due(lot['guid'], 'telegram'):
+            OUTBOX.begin(lot['guid'], 'telegram')
+            # Импорт aiogram в event loop заблокировал бы /health, а ожидание его здесь — PDF и письмо
+            task = asyncio.create_task(send_notification(lot['guid'], message))
+            NOTIFY_TASKS.add(task)
+            task.add_done_callback(NOTIFY_TASKS.discard)
+        return lot
+    
+    # Генерируем PDF в памяти в пуле потоков (только если заявку пора отправлять)
+    async def render(lot):
+        if not OUTBOX.is_due(lot['guid'], 'email'):
+            return None
+        OUTBOX.begin(lot['guid'], 'email')
+        try:
+            await PDF_LOADED
+            lot['pdf'] = await loop.run_in_executor(pdf_executor, generate_pdf, lot['trustee_name'], lot['case_info'])
+        except Exception:
+            # Попытка завершена неудачей — канал снова доступен после паузы
+            OUTBOX.finish(lot['guid'], 'email', False)
+            raise
+        return lot
+    
+    # Отправляем заявку
+    async def email(lot):
+        sent = await loop.run_in_executor(email_executor, send_email, f"Заявка на {lot['lot_number']}", lot['pdf'])
+        OUTBOX.finish(lot['guid'], 'email', sent)
+    
+    return LotPipeline([
+        ('enrich', enrich, ENRICH_WORKERS),
+        ('notify', notify, NOTIFY_WORKERS),
+        ('render', render, RENDER_WORKERS),
+        ('email', email, EMAIL_WORKERS),
+    ])
+
+# Поток торгов выбранным бэкендом: (управляющий, торги) по мере готовности
+async def iter_trades(session, seen_cases=None, trustee_names=None, failed=None):
+    remaining = list(trustee_names or TRUSTEE_NAMES)
+    broad = PARSER_MODE == 'broad'
+    if PARSER_BACKEND == 'http' and HTTP_PARSER_AVAILABLE:
+        http_failed = []
+        if broad:
+            http_stream = stream_trades_broad_http(session, remaining, failed=http_failed, known_guids=seen_cases)
+        else:
+            http_stream = stream_trades_http(session, remaining, failed=http_failed, known_guids=seen_cases)
+        async for trustee_name, trades in http_stream:
+            yield trustee_name, trades
+        remaining = http_failed
+        if remaining and not SELENIUM_AVAILABLE:
+            print(f"⚠ Selenium недоступен, повтор отложен до следующего опроса: {'широкий запрос' if broad else ', '.join(remaining)}")
+            if failed is not None:
+                failed.extend(remaining)
+            return
+        if remaining:
+            print(f"⚠ Повторяем через Selenium: {'широкий запрос' if broad else ', '.join(remaining)}")
+    if remaining:
+        if broad:
+            selenium_stream = stream_trades_broad(remaining, known_guids=seen_cases, failed=failed)
+        else:
+            selenium_stream = stream_trades(remaining, known_guids=seen_cases, failed=failed)
+        async for trustee_name, trades in selenium_stream:
+            yield trustee_name, trades
+
+async def run_http_server():
+    app = web.Application()
+    app.router.add_get('/health', handle_health)
+    app.router.add_get('/status', handle_status)
+    app.router.add_get('/metrics', handle_metrics)
+    app.router.add_get('/', handle_health)  # Корневой путь тоже отдаём статус
+    
+    port = int(os.environ.get('PORT', 10000))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '0.0.0.0', port)
+    await site.start()
+    print(f"✓ HTTP сервер запущен на порту {port} для Render health checks")
+    return runner
+
+# Импорт модуля с замером времени для отчёта о запуске
+def timed_import(name):
+    started = time.monotonic()
+    module = importlib.import_module(name)
+    STARTUP['imports'][name] = round(time.monotonic() - started, 3)
+    return module
+
+# Парсеры: без парсера выбранного бэкенда итерации не начинаются
+def load_parsers():
+    global PARSER_AVAILABLE, HTTP_PARSER_AVAILABLE, SELENIUM_AVAILABLE
+    global stream_trades, get_driver_pool, close_driver_pool, TRUSTEE_NAMES, MIN_DATE, stream_trades_http
+    global stream_trades_broad, stream_trades_broad_http, BROAD_STATE_KEY, is_blank
+    
+    # Список управляющих и дата фильтра не зависят от selenium
+    common = timed_import('parser_common')
+    TRUSTEE_NAMES, MIN_DATE, BROAD_STATE_KEY = common.TRUSTEE_NAMES, common.MIN_DATE, common.BROAD_STATE_KEY
+    is_blank = common.is_blank
+    
+    # Парсер без браузера (HTTP/JSON API)
+    if PARSER_BACKEND == 'http':
+        try:
+            parser_http = timed_import('parser_fedresurs_http')
+            stream_trades_http, stream_trades_broad_http = parser_http.stream_trades_http, parser_http.stream_trades_broad_http
+            HTTP_PARSER_AVAILABLE = True
+        except ImportError as e:
+            HTTP_PARSER_AVAILABLE = False
+            print(f"✗ HTTP-парсер недоступен: {e}")
+    
+    # Selenium: основной бэкенд либо запасной вариант для HTTP
+    try:
+        parser = timed_import('parser_fedresurs')
+        stream_trades, get_driver_pool, close_driver_pool = (
+            parser.stream_trades, parser.get_driver_pool, parser.close_driver_pool
+        )
+        stream_trades_broad = parser.stream_trades_broad
+        SELENIUM_AVAILABLE = True
+    except ImportError:
+        SELENIUM_AVAILABLE = False
+        print("⚠ Selenium-парсер недоступен. Установите: pip install selenium webdriver-manager")
+    
+    PARSER_AVAILABLE = HTTP_PARSER_AVAILABLE if PARSER_BACKEND == 'http' else SELENIUM_AVAILABLE
+
+# PDF (reportlab) и Telegram (aiogram): грузятся в фоне, пока идёт первый поиск
+def load_delivery(name):
+    try:
+        timed_import(name)
+    except ImportError as e:
+        print(f"✗ Не удалось загрузить {name}: {e}")
+
+# Основной цикл с использованием парсера
+async def main(test_mode=False):
+    print("=== BankrotParser v1.1 ===")
+    print("=== Запуск с использованием парсера fedresurs.ru ===")
+    
+    # Запускаем HTTP сервер для Render до загрузки тяжёлых модулей
+    http_runner = await run_http_server()
+    STARTUP['health_ready_s'] = round(time.monotonic() - PROCESS_STARTED, 3)
+    loop = asyncio.get_running_loop()
+    global PDF_LOADED, TELEGRAM_LOADED
+    PDF_LOADED = loop.run_in_executor(None, load_delivery, 'pdf_template')
+    TELEGRAM_LOADED = loop.run_in_executor(None, load_delivery, 'telegram_sender')
+    asyncio.gather(PDF_LOADED, TELEGRAM_LOADED).add_done_callback(
+        lambda _: STARTUP.update(delivery_ready_s=round(time.monotonic() - PROCESS_STARTED, 3))
+    )
+    await loop.run_in_executor(None, load_parsers)
+    
+    if not PARSER_AVAILABLE:
+        print(f"✗ Парсер для бэкенда {PARSER_BACKEND} недоступен. Установите зависимости: pip install -r requirements.txt")
+        STARTUP['state'] = 'parser_unavailable'
+        # Держим сервер запущенным даже без парсера, чтобы Render не падал
+        while True:
+            await asyncio.sleep(10)
+        return
+    
+    print(f"Дата фильтра: не ранее {MIN_DATE.strftime('%d.%m.%Y')}")
+    # В режиме шардов каждый экземпляр опрашивает свою часть управляющих
+    trustee_names = shard_trustees(TRUSTEE_NAMES)
+    if SHARD_COUNT > 1:
+        print(f"Шард {SHARD_INDEX + 1} из {SHARD_COUNT}: управляющих {len(trustee_names)} из {len(TRUSTEE_NAMES)}")
+    else:
+        print(f"Управляющие: {len(TRUSTEE_NAMES)}")
+    
+    global SEEN_CASES, LOT_CLAIMS
+    SEEN_CASES = seen_cases = load_seen_cases()
+    if SHARD_COUNT > 1:
+        owner = f"{socket.gethostname()}-{os.getpid()}-shard{SHARD_INDEX}"
+        LOT_CLAIMS = LotClaims(LOT_CLAIMS_DB, owner, CLAIM_LEASE_SECONDS)
+    
+    # Недоставленные с прошлого запуска лоты; в режиме шардов — только те, что удалось снова захватить
+    global OUTBOX
+    OUTBOX = outbox = Outbox(load_pending_lots, save_pending_lots, on_complete=complete_lot)
+    for guid in outbox:
+        if LOT_CLAIMS and not await claim_lot(guid, outbox.lot(guid)):
+            print(f"Лот {guid} уже обрабатывается другим шардом")
+            outbox.discard(guid)
+    
+    # Путь к chromedriver определяем один раз на весь срок жизни сервиса
+    # (для HTTP-бэкенда Selenium нужен только как запасной вариант — готовим при первой надобности)
+    if PARSER_BACKEND != 'http' and SELENIUM_AVAILABLE:
+        started = time.monotonic()
+        try:
+            await loop.run_in_executor(None, get_driver_pool().warm_up)
+        except Exception as e:
+            print(f"✗ Не удалось подготовить chromedriver: {e}")
+        STARTUP['driver_warm_up_s'] = round(time.monotonic() - started, 3)
+    
+    STARTUP.update(state='ready', ready_s=round(time.monotonic() - PROCESS_STARTED, 3))
+    imports = ', '.join(f"{name} {secs:.2f} с" for name, secs in STARTUP['imports'].items())
+    print(f"✓ Сервис готов за {STARTUP['ready_s']:.2f} с: /health через {STARTUP['health_ready_s']:.3f} с; "
+          f"импорт: {imports}")
+    
+    # Обработка сигналов завершения
+    stop_signal = asyncio.Event()
+    
+    def signal_handler():
+        print("\n⚠️ Получен сигнал завершения, останавливаемся...")
+        stop_signal.set()
+    
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, signal_handler)
+    
+    # Для API дел — отдельная сессия с ограничением числа соединений
+    case_cache = CaseCache(CASE_CACHE_DB, CASE_CACHE_TTL_HOURS * 3600)
+    # История всех найденных торгов (trade_history.py) — пишется по мере поступления
+    trade_history = TradeHistory(TRADE_HISTORY_DB)
+    case_connector = aiohttp.TCPConnector(limit=CASE_API_CONNECTIONS)
+    async with aiohttp.ClientSession() as session, aiohttp.ClientSession(connector=case_connector) as case_session:
+        global LOT_PIPELINE
+        LOT_PIPELINE = pipeline = build_lot_pipeline(case_session, case_cache)
+        pipeline.start()
+        global SCHEDULER
+        SCHEDULER = scheduler = PollScheduler(trustee_names)
+        # Повторы доставки идут независимо от итераций парсинга
+        outbox_task = asyncio.create_task(outbox.run(lambda lot: retry_lot(lot, pipeline)), name='outbox')
+        iterations = 0
+        
+        while not stop_signal.is_set():
+            # В тестовом режиме — два полных прохода по всем управляющим,
+            # широкий запрос охватывает всех управляющих сразу и идёт раз в CHECK_INTERVAL
+            fixed_cycle = test_mode or PARSER_MODE == 'broad'
+            due = list(trustee_names) if fixed_cycle else scheduler.due()
+            
+            # Лоты упавших посреди обработки экземпляров (аренда истекла) дорабатываем здесь
+            if LOT_CLAIMS:
+                for lot in await loop.run_in_executor(None, LOT_CLAIMS.reclaim_expired):
+                    print(f"⚠ Повторная обработка лота {lot['guid']} после истечения аренды")
+                    LOT_CLAIMS_TOTAL.inc(result='reclaimed')
+                    seen_cases.add(lot['guid'], lot['case_info'].get('publish_date'))
+                    if lot['guid'] not in OUTBOX:
+                        OUTBOX.add(lot, delivery_channels())
+                    pipeline.submit(lot)
+            
+            if due:
+                print(f"\n--- Итерация {iterations + 1}: {', '.join(due)} ---")
+                ITERATION_STATUS.update(
+                    iteration=iterations + 1, state='scraping', started_at=datetime.now().isoformat(timespec='seconds'),
+                    trustees=due, trustees_done=0, trades_found=0, new_lots=0
+                )
+                
+                # Получаем торги через парсер и обрабатываем их, не дожидаясь остальных управляющих
+                failed = []
+                publish_dates = {name: [] for name in due}
+                try:
+                    found = 0
+                    async for trustee_name, trades in iter_trades(session, seen_cases, due, failed):
+                        found += len(trades)
+                        ITERATION_STATUS['trustees_done'] += 1
+                        ITERATION_STATUS['trades_found'] = found
+                        publish_dates.setdefault(trustee_name, []).extend(trade['publish_date'] for trade in trades)
+                        try:
+                            trade_history.append(trades)
+                        except sqlite3.Error as e:
+                            print(f"⚠ Не удалось записать историю торгов: {e}")
+                        for trade in trades:
+                            await process_new_lot(trade['trustee_name'], trade, seen_cases, pipeline)
+                    print(f"Найдено {found} торгов")
+                    # Успешный цикл — хотя бы один управляющий опрошен без ошибки
+                    if len(set(failed)) < len(due):
+                        LAST_SUCCESSFUL_SCRAPE.set(time.time())
+                        ITERATION_STATUS['last_success_at'] = datetime.now().isoformat(timespec='seconds')
+                    else:
+                        print(f"✗ Не удалось опросить ни одного управляющего: {', '.join(due)}")
+                        
+                except Exception as e:
+                    print(f"Ошибка парсера: {e}")
+                    failed.extend(due)
+                
+                # Отметки и отпечатки страниц — только для управляющих, чьи торги обработаны без ошибки
+                polled = [name for name in due if name not in failed]
+                if polled and PARSER_MODE == 'broad':
+                    polled.append(BROAD_STATE_KEY)
+                scheduler.state.commit(polled)
+                
+                # Следующий опрос каждого управляющего — по его истории публикаций и ошибкам
+                for trustee_name in due:
+                    scheduler.record_poll(trustee_name, publish_dates[trustee_name], ok=trustee_name not in failed)
+                # Состояние управляющих — одной записью trustee_state.json за опрос
+                scheduler.state.flush()
+                
+                await loop.run_in_executor(None, save_seen_cases, seen_cases)
+                iterations += 1
+                if test_mode and iterations >= 2:
+                    break
+            
+            ITERATION_STATUS['state'] = 'sleeping'
+            
+            # Ожидание ближайшего опроса с возможностью досрочного выхода
+            delay = CHECK_INTERVAL if fixed_cycle else max(1, scheduler.seconds_until_next())
+            deadline = time.monotonic() + delay
+            while not stop_signal.is_set() and time.monotonic() < deadline:
+                await asyncio.sleep(min(1, deadline - time.monotonic()))
+        
+        # Дожидаемся отправки уже найденных лотов
+        outbox_task.cancel()
+        await pipeline.join()
+        await pipeline.stop()
+        if NOTIFY_TASKS:
+            await asyncio.gather(*NOTIFY_TASKS, return_exceptions=True)
+        if TELEGRAM_SENDER:
+            await TELEGRAM_SENDER.drain()
+            await TELEGRAM_SENDER.close()
+        if SMTP_CLIENT:
+            # QUIT ждёт ответа сервера до таймаута — вне event loop
+            await loop.run_in_executor(None, SMTP_CLIENT.close)
+    
+    # Очистка перед выходом
+    if SELENIUM_AVAILABLE:
+        await loop.run_in_executor(None, close_driver_pool)
+    seen_cases.close()
+    case_cache.close()
+    if LOT_CLAIMS:
+        if CLAIM_COMPLETIONS:
+            await asyncio.gather(*CLAIM_COMPLETIONS, return_exceptions=True)
+        LOT_CLAIMS.close()
+    trade_history.close()
+    await http_runner.cleanup()
+    print("✅ Сервис остановлен")
+
+async def handle_health(request):
+    return web.Response(text="BankrotParser is running")
+
+async def handle_status(request):
+    return web.json_response({
+        # ready -> running; warming и parser_unavailable (парсер так и не загрузился) — как есть
+        "status": "running" if STARTUP['state'] == 'ready' else STARTUP['state'],
+        "startup": STARTUP,
+        "service": "BankrotParser",
+        "parser_available": PARSER_AVAILABLE,
+        "parser_backend": PARSER_BACKEND,
+        "parser_mode": PARSER_MODE,
+        "queues": LOT_PIPELINE.queue_depths() if LOT_PIPELINE else {},
+        "iteration": ITERATION_STATUS,
+        "schedule": SCHEDULER.snapshot() if SCHEDULER else {},
+        "shard": {"index": SHARD_INDEX, "count": SHARD_COUNT},
+        "outbox": OUTBOX.pending() if OUTBOX else {},
+        "seen_lots": len(SEEN_CASES) if SEEN_CASES is not None else 0
+    })
+
+async def handle_metrics(request):
+    if LOT_PIPELINE:
+        for stage, depth in LOT_PIPELINE.queue_depths().items():
+            QUEUE_DEPTH.set(depth, stage=stage)
+    if SEEN_CASES is not None:
+        SEEN_STORE_SIZE.set(len(SEEN_CASES))
+    if OUTBOX:
+        for channel in ('telegram', 'email'):
+            OUTBOX_PENDING.set(OUTBOX.pending().get(channel, 0), channel=channel)
+    return web.Response(text=metrics.render(), headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+
+# Точка входа
+if __name__ == '__main__':
+    import sys
+    
+    test_mode = '--test' in sys.argv
+    asyncio.run(main(test_mode=test_mode))
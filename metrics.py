@@ -0,0 +1,154 @@
+"""
+Метрики сервиса в текстовом формате Prometheus
+Минимальная потокобезопасная реализация счётчиков, gauge и гистограмм без внешних зависимостей
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Границы корзин гистограмм задержек, секунд
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REGISTRY = []
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        return [f'{self.name}{_format_labels(self.label_names, key)} {value}' for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def totals(self):
+        """{значения меток: значение}"""
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Замер длительности блока"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def totals(self):
+        """{значения меток: (число наблюдений, сумма)}"""
+        with self._lock:
+            return {key: (state['count'], state['sum']) for key, state in self._values.items()}
+
+    def _samples(self):
+        lines = []
+        for key, state in self._values.items():
+            for bound, count in zip(self.buckets, state['buckets']):
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, key, [("le", bound)])} {count}')
+            lines.append(f'{self.name}_bucket{_format_labels(self.label_names, key, [("le", "+Inf")])} {state["count"]}')
+            lines.append(f'{self.name}_sum{_format_labels(self.label_names, key)} {state["sum"]}')
+            lines.append(f'{self.name}_count{_format_labels(self.label_names, key)} {state["count"]}')
+        return lines
+
+
+def render():
+    """Все метрики в формате Prometheus text exposition 0.0.4"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+STAGE_SECONDS = Histogram(
+    'bankrot_stage_duration_seconds',
+    'Длительность стадий: driver_startup, page_wait, fingerprint, extraction, fedresurs_api, case_api, pdf, smtp, telegram',
+    labels=('stage',)
+)
+TRUSTEE_SCRAPE_SECONDS = Histogram(
+    'bankrot_trustee_scrape_seconds', 'Полное время поиска по управляющему', labels=('trustee',)
+)
+TRADES_FOUND = Counter('bankrot_trades_found_total', 'Найдено торгов', labels=('trustee',))
+NEW_LOTS = Counter('bankrot_new_lots_total', 'Новые лоты, поставленные в обработку')
+DUPLICATES = Counter('bankrot_duplicate_lots_total', 'Лоты, уже обработанные ранее')
+UNCHANGED_PAGES = Counter(
+    'bankrot_unchanged_pages_total', 'Поиски, пропустившие извлечение: страница не изменилась', labels=('trustee',)
+)
+TRUSTEE_ERRORS = Counter('bankrot_trustee_errors_total', 'Ошибки поиска по управляющему', labels=('trustee',))
+LOT_CLAIMS_TOTAL = Counter(
+    'bankrot_lot_claims_total', 'Лоты, уступленные другому шарду или подобранные после истечения аренды',
+    labels=('result',)
+)
+DELIVERIES = Counter('bankrot_deliveries_total', 'Доставки уведомлений и заявок', labels=('channel', 'result'))
+LAST_SUCCESSFUL_SCRAPE = Gauge(
+    'bankrot_last_successful_scrape_timestamp_seconds', 'Время окончания последнего успешного цикла парсинга'
+)
+SEEN_STORE_SIZE = Gauge('bankrot_seen_store_size', 'Число GUID в хранилище обработанных лотов')
+QUEUE_DEPTH = Gauge('bankrot_queue_depth', 'Длина очередей конвейера обработки лотов', labels=('stage',))
+POLL_INTERVAL = Gauge(
+    'bankrot_trustee_poll_interval_seconds', 'Текущий интервал опроса управляющего по расписанию', labels=('trustee',)
+)
+PAGE_REQUESTS = Counter(
+    'bankrot_page_requests_total', 'Запросы браузера при поиске: загруженные и заблокированные',
+    labels=('trustee', 'result')
+)
+PAGE_BYTES = Counter('bankrot_page_bytes_total', 'Байты, загруженные браузером при поиске', labels=('trustee',))
+OUTBOX_PENDING = Gauge('bankrot_outbox_pending', 'Недоставленные лоты по каналам', labels=('channel',))
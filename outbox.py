@@ -0,0 +1,154 @@
+"""
+Очередь недоставленных уведомлений и заявок (outbox)
+Каждый лот хранится с перечнем каналов (telegram, email), по которым доставка ещё не удалась;
+состояние сохраняется на диск при каждом изменении, повторы идут с экспоненциальной паузой
+независимо от циклов парсинга, после перезапуска недоставленное отправляется сразу.
+"""
+
+import asyncio
+import time
+
+
+# Пауза перед повтором: BACKOFF_BASE * 2^(попытка - 1), не больше BACKOFF_MAX секунд
+BACKOFF_BASE = 30
+BACKOFF_MAX = 3600
+MAX_ATTEMPTS = 20
+POLL_INTERVAL = 5
+
+# Поля лота, которые сохраняются (PDF и прочие промежуточные данные рендерятся заново)
+LOT_FIELDS = ('guid', 'trustee_name', 'case_info', 'lot_number')
+
+
+class Outbox:
+    """
+    {guid: {'lot': лот, 'channels': {канал: {'attempts', 'next_at'}}}}.
+    load() и save(data) — чтение и запись состояния (pending_lots.json),
+    on_complete(guid) вызывается, когда лот доставлен по всем каналам (или каналов нет).
+    Канал между begin() и finish() считается занятым и не выдаётся повторно,
+    пока попытка не завершится (не дольше backoff_max секунд — на случай потерянного результата).
+    Методы вызываются из потока event loop.
+    """
+
+    def __init__(self, load, save, on_complete=None,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, max_attempts=MAX_ATTEMPTS):
+        self._save = save
+        self.on_complete = on_complete
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_attempts = max_attempts
+        self._entries = load() or {}
+        # (guid, канал) -> время начала незавершённой попытки; только в памяти
+        self._in_flight = {}
+        # После перезапуска всё недоставленное — к отправке сразу
+        for entry in self._entries.values():
+            for state in entry['channels'].values():
+                state['next_at'] = 0
+        if self._entries:
+            print(f"✓ Недоставленных лотов в очереди: {len(self._entries)}")
+
+    def __contains__(self, guid):
+        return guid in self._entries
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def add(self, lot, channels):
+        """Записать новый лот с каналами доставки; без каналов лот сразу считается доставленным"""
+        if not channels:
+            if self.on_complete:
+                self.on_complete(lot['guid'])
+            return
+        self._entries[lot['guid']] = {
+            'lot': {key: lot[key] for key in LOT_FIELDS if key in lot},
+            'channels': {channel: {'attempts': 0, 'next_at': 0} for channel in channels},
+        }
+        self._save(self._entries)
+
+    def update_lot(self, lot):
+        """Сохранить дополненный лот (детали дела), чтобы повтор не запрашивал их снова"""
+        entry = self._entries.get(lot['guid'])
+        if entry:
+            entry['lot'] = {key: lot[key] for key in LOT_FIELDS if key in lot}
+            self._save(self._entries)
+
+    def _backoff(self, attempts):
+        return min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+
+    def _waiting(self, guid, channel, state, now):
+        """Канал ещё не пора повторять: пауза не истекла или попытка не завершена"""
+        started = self._in_flight.get((guid, channel))
+        if started is not None and now - started < self.backoff_max:
+            return True
+        return state['next_at'] > now
+
+    def is_due(self, guid, channel, now=None):
+        """Пора ли доставлять лот по каналу"""
+        state = self._entries.get(guid, {}).get('channels', {}).get(channel)
+        return state is not None and not self._waiting(guid, channel, state, now or time.time())
+
+    def begin(self, guid, channel):
+        """
+        Начало попытки: следующая назначается заранее, поэтому лот, по которому
+        процесс упал или результат не пришёл, будет повторён и после перезапуска
+        """
+        state = self._entries[guid]['channels'][channel]
+        state['attempts'] += 1
+        now = time.time()
+        state['next_at'] = now + self._backoff(state['attempts'])
+        self._in_flight[(guid, channel)] = now
+        self._save(self._entries)
+
+    def finish(self, guid, channel, ok):
+        """Результат попытки: при успехе канал снимается, при неудаче остаётся до следующей попытки"""
+        self._in_flight.pop((guid, channel), None)
+        entry = self._entries.get(guid)
+        if not entry or channel not in entry['channels']:
+            return
+        state = entry['channels'][channel]
+        if ok:
+            del entry['channels'][channel]
+        elif state['attempts'] >= self.max_attempts:
+            print(f"✗ Лот {guid}: доставка в {channel} не удалась за {state['attempts']} попыток, отказ")
+            del entry['channels'][channel]
+        else:
+            # Пауза отсчитывается от неудачи, а не от начала попытки
+            state['next_at'] = time.time() + self._backoff(state['attempts'])
+            print(f"⚠ Лот {guid}: повтор доставки в {channel} через {state['next_at'] - time.time():.0f} с")
+        if not entry['channels']:
+            del self._entries[guid]
+            if ok and self.on_complete:
+                self.on_complete(guid)
+        self._save(self._entries)
+
+    def discard(self, guid):
+        for key in [key for key in self._in_flight if key[0] == guid]:
+            del self._in_flight[key]
+        if self._entries.pop(guid, None) is not None:
+            self._save(self._entries)
+
+    def lot(self, guid):
+        entry = self._entries.get(guid)
+        return dict(entry['lot']) if entry else None
+
+    def due_lots(self, now=None):
+        """Лоты, у которых подошло время хотя бы одного канала"""
+        now = now or time.time()
+        return [
+            dict(entry['lot']) for guid, entry in self._entries.items()
+            if any(not self._waiting(guid, channel, state, now) for channel, state in entry['channels'].items())
+        ]
+
+    def pending(self):
+        """Число недоставленных лотов по каналам"""
+        counts = {}
+        for entry in self._entries.values():
+            for channel in entry['channels']:
+                counts[channel] = counts.get(channel, 0) + 1
+        return counts
+
+    async def run(self, submit, interval=POLL_INTERVAL):
+        """Фоновый повтор: лоты, которым пора, передаются в корутину submit(lot)"""
+        while True:
+            for lot in self.due_lots():
+                await submit(lot)
+            await asyncio.sleep(interval)
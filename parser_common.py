@@ -0,0 +1,157 @@
+"""
+Общее для парсеров (Selenium и HTTP): список управляющих, настройки обхода,
+разбор дат, отметки прошлых запусков и дедупликация торгов.
+Модуль не зависит от selenium — HTTP-бэкенд работает и без браузера.
+"""
+
+import os
+import re
+from datetime import datetime
+
+from trustee_state import get_trustee_state
+from trustee_index import load_trustee_names
+from seen_store import lot_key
+
+
+TRUSTEE_NAMES = [
+    'Мурдашева Алсу Ишбулатновна',
+    'Калашникова Наталья Александровна',
+    'Закиров Тимур Назифович',
+    'Фамиев Ильнур Илдусович',
+    'Галеева Алина Рифмеровна',
+    'Тихонова Кристина Александровна'
+]
+
+# Список управляющих из файла (по одному на строку) вместо встроенного
+TRUSTEES_FILE = os.getenv('TRUSTEES_FILE')
+if TRUSTEES_FILE:
+    TRUSTEE_NAMES = load_trustee_names(TRUSTEES_FILE)
+
+# Дата, не ранее которой искать торги (22.02.2026)
+MIN_DATE = datetime(2026, 2, 22)
+
+# Адрес сайта (для бенчмарков можно указать локальный стенд)
+FEDRESURS_URL = os.getenv('FEDRESURS_URL', 'https://bankrot.fedresurs.ru').rstrip('/')
+
+# Количество параллельных браузеров (1 — последовательный обход)
+PARSER_CONCURRENCY = int(os.getenv('PARSER_CONCURRENCY', '3'))
+
+# Минимальный интервал между загрузками страниц одного хоста, секунд
+HOST_MIN_INTERVAL = float(os.getenv('PARSER_HOST_INTERVAL', '2'))
+
+# Постраничный обход: предел страниц
+MAX_PAGES = int(os.getenv('PARSER_MAX_PAGES', '10'))
+
+# Широкий запрос: все торги с даты отметки прошлого запроса, управляющие сопоставляются локально
+BROAD_SEARCH_URL = os.getenv('PARSER_BROAD_URL', '{base}/trades?datePublishFrom={date_from}')
+BROAD_MAX_PAGES = int(os.getenv('PARSER_BROAD_MAX_PAGES', '50'))
+# Ключ отметки широкого запроса в trustee_state.json
+BROAD_STATE_KEY = '*'
+
+
+def parse_date(date_str):
+    """Парсинг даты из строки"""
+    try:
+        # Форматы дат: "22.02.2026", "22 февраля 2026", etc.
+        patterns = [
+            r'(\d{2})\.(\d{2})\.(\d{4})',
+            r'(\d{2})\s+(\w+)\s+(\d{4})',
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, date_str)
+            if match:
+                if '.' in date_str:
+                    day, month, year = match.groups()
+                    return datetime(int(year), int(month), int(day))
+                else:
+                    # Русские месяцы
+                    months = {
+                        'января': 1, 'февраля': 2, 'марта': 3, 'апреля': 4,
+                        'мая': 5, 'июня': 6, 'июля': 7, 'августа': 8,
+                        'сентября': 9, 'октября': 10, 'ноября': 11, 'декабря': 12
+                    }
+                    day, month_str, year = match.groups()
+                    month = months.get(month_str.lower(), 1)
+                    return datetime(int(year), month, int(day))
+    except Exception as e:
+        print(f"Ошибка парсинга даты '{date_str}': {e}")
+    
+    return None
+
+
+def is_recent(trade):
+    """Фильтр по MIN_DATE; торги без даты или с нераспознанной датой оставляем для проверки"""
+    trade_date = parse_date(trade['publish_date']) if trade['publish_date'] else None
+    return not trade_date or trade_date >= MIN_DATE
+
+
+def is_blank(trade):
+    """
+    Не торг: строка без GUID, по которой лот не опознать по содержимому. Отпечаток строится только
+    при распознанной дате публикации и номере лота или должнике — иначе пункт меню, подпись фильтра
+    или вложенный элемент, совпавший с селектором строки, стал бы лотом
+    """
+    if trade.get('guid'):
+        return False
+    return not (parse_date(trade.get('publish_date') or '') and (trade.get('lot_number') or trade.get('debtor_name')))
+
+
+def reached_known_trades(trades, known_guids=None, high_water=None):
+    """
+    Пора ли прекращать постраничный обход: на странице есть уже обработанный GUID,
+    отметка прошлого запуска или торг старше MIN_DATE / даты отметки.
+    """
+    high_water = high_water or {}
+    high_water_date = parse_date(high_water['publish_date']) if high_water.get('publish_date') else None
+    for trade in trades:
+        key = lot_key(trade)
+        if key == high_water.get('guid') or (known_guids and key in known_guids):
+            return True
+        trade_date = parse_date(trade['publish_date']) if trade['publish_date'] else None
+        if trade_date and (trade_date < MIN_DATE or (high_water_date and trade_date < high_water_date)):
+            return True
+    return False
+
+
+def update_high_water(trustee_name, trades):
+    """Отложить отметку самого свежего торга управляющего с GUID (применяется commit() после обработки)"""
+    newest = None
+    newest_date = None
+    for trade in trades:
+        trade_date = parse_date(trade['publish_date']) if trade['publish_date'] else None
+        if trade['guid'] and trade_date and (newest_date is None or trade_date > newest_date):
+            newest, newest_date = trade, trade_date
+    if newest:
+        get_trustee_state().stage(
+            trustee_name, high_water={'guid': newest['guid'], 'publish_date': newest['publish_date']}
+        )
+
+
+def broad_date_from(high_water=None):
+    """Дата начала широкого запроса (ГГГГ-ММ-ДД): день отметки прошлого запроса или MIN_DATE"""
+    high_water_date = parse_date(high_water['publish_date']) if high_water and high_water.get('publish_date') else None
+    return (high_water_date or MIN_DATE).strftime('%Y-%m-%d')
+
+
+def group_by_trustee(trades, trustee_names):
+    """Пары (управляющий, торги) в порядке trustee_names — только для управляющих с торгами"""
+    grouped = {}
+    for trade in trades:
+        grouped.setdefault(trade['trustee_name'], []).append(trade)
+    return [(name, grouped[name]) for name in trustee_names if name in grouped]
+
+
+def deduplicate_trades(trades, seen_keys=None):
+    """
+    Удаление дубликатов по GUID, у торгов без GUID — по отпечатку содержимого (lot_key).
+    seen_keys — общее множество для дедупликации между несколькими вызовами.
+    """
+    seen_keys = set() if seen_keys is None else seen_keys
+    unique_trades = []
+    for trade in trades:
+        key = lot_key(trade)
+        if key not in seen_keys:
+            seen_keys.add(key)
+            unique_trades.append(trade)
+    return unique_trades
@@ -1,257 +1,973 @@
-"""
-Парсер банкротных торгов с bankrot.fedresurs.ru
-Использует Selenium для получения данных из SPA приложения
-"""
-
-import json
-import time
-import re
-from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-
-
-TRUSTEE_NAMES = [
-    'Мурдашева Алсу Ишбулатновна',
-    'Калашникова Наталья Александровна',
-    'Закиров Тимур Назифович',
-    'Фамиев Ильнур Илдусович',
-    'Галеева Алина Рифмеровна',
-    'Тихонова Кристина Александровна'
-]
-
-# Дата, не ранее которой искать торги (22.02.2026)
-MIN_DATE = datetime(2026, 2, 22)
-
-
-def create_driver():
-    """Создание драйвера Chrome с настройками для headless режима"""
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')  # Без GUI
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-    
-    # Отключаем автоматизацию
-    chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-            'source': '''
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                })
-            '''
-        })
-        return driver
-    except Exception as e:
-        print(f"Ошибка создания драйвера: {e}")
-        return None
-
-
-def parse_date(date_str):
-    """Парсинг даты из строки"""
-    try:
-        # Форматы дат: "22.02.2026", "22 февраля 2026", etc.
-        patterns = [
-            r'(\d{2})\.(\d{2})\.(\d{4})',
-            r'(\d{2})\s+(\w+)\s+(\d{4})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, date_str)
-            if match:
-                if '.' in date_str:
-                    day, month, year = match.groups()
-                    return datetime(int(year), int(month), int(day))
-                else:
-                    # Русские месяцы
-                    months = {
-                        'января': 1, 'февраля': 2, 'марта': 3, 'апреля': 4,
-                        'мая': 5, 'июня': 6, 'июля': 7, 'августа': 8,
-                        'сентября': 9, 'октября': 10, 'ноября': 11, 'декабря': 12
-                    }
-                    day, month_str, year = match.groups()
-                    month = months.get(month_str.lower(), 1)
-                    return datetime(int(year), month, int(day))
-    except Exception as e:
-        print(f"Ошибка парсинга даты '{date_str}': {e}")
-    
-    return None
-
-
-def search_trades_by_trustee(driver, trustee_name):
-    """Поиск торгов по имени управляющего"""
-    trades = []
-    
-    try:
-        # Открываем страницу торгов
-        url = 'https://bankrot.fedresurs.ru/trades'
-        driver.get(url)
-        
-        # Ждем загрузки страницы
-        wait = WebDriverWait(driver, 30)
-        
-        # Ищем поле поиска (может быть разное в зависимости от версии сайта)
-        try:
-            # Пробуем найти поле поиска по управляющему
-            search_input = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'input[placeholder*="управляющий"], input[placeholder*="Управляющий"], input[name*="trustee"], input[name*="arbitr"]'))
-            )
-            search_input.clear()
-            search_input.send_keys(trustee_name)
-            
-            # Ищем кнопку поиска
-            search_button = driver.find_element(By.CSS_SELECTOR, 'button[type="submit"], button.search-btn, .search-button')
-            search_button.click()
-            
-        except Exception as e:
-            print(f"Не удалось найти поле поиска для {trustee_name}: {e}")
-            # Пробуем альтернативный способ - через URL параметры
-            search_url = f'https://bankrot.fedresurs.ru/trades?search={trustee_name.replace(" ", "%20")}'
-            driver.get(search_url)
-        
-        # Ждем загрузки результатов
-        time.sleep(5)
-        
-        # Ищем элементы с торгами
-        trade_elements = driver.find_elements(By.CSS_SELECTOR, '.trade-item, .lot-item, [class*="trade"], [class*="lot"]')
-        
-        for element in trade_elements:
-            try:
-                # Извлекаем данные о торге
-                trade_data = {
-                    'trustee_name': trustee_name,
-                    'debtor_name': '',
-                    'lot_number': '',
-                    'description': '',
-                    'publish_date': '',
-                    'guid': '',
-                    'url': ''
-                }
-                
-                # Пробуем найти различные поля
-                try:
-                    trade_data['debtor_name'] = element.find_element(By.CSS_SELECTOR, '.debtor-name, [class*="debtor"]').text
-                except:
-                    pass
-                
-                try:
-                    trade_data['lot_number'] = element.find_element(By.CSS_SELECTOR, '.lot-number, [class*="lot"]').text
-                except:
-                    pass
-                
-                try:
-                    trade_data['description'] = element.find_element(By.CSS_SELECTOR, '.description, [class*="desc"]').text
-                except:
-                    pass
-                
-                try:
-                    date_element = element.find_element(By.CSS_SELECTOR, '.date, [class*="date"], [class*="publish"]')
-                    trade_data['publish_date'] = date_element.text
-                except:
-                    pass
-                
-                try:
-                    link = element.find_element(By.TAG_NAME, 'a')
-                    trade_data['url'] = link.get_attribute('href')
-                    # Извлекаем GUID из URL если есть
-                    guid_match = re.search(r'guid=([a-f0-9-]+)', trade_data['url'])
-                    if guid_match:
-                        trade_data['guid'] = guid_match.group(1)
-                except:
-                    pass
-                
-                # Проверяем дату
-                if trade_data['publish_date']:
-                    trade_date = parse_date(trade_data['publish_date'])
-                    if trade_date and trade_date >= MIN_DATE:
-                        trades.append(trade_data)
-                    elif not trade_date:
-                        # Если не удалось распарсить дату, добавляем на всякий случай
-                        trades.append(trade_data)
-                else:
-                    # Если нет даты, добавляем для проверки
-                    trades.append(trade_data)
-                    
-            except Exception as e:
-                print(f"Ошибка обработки элемента торга: {e}")
-                continue
-        
-        print(f"Найдено {len(trades)} торгов для {trustee_name}")
-        
-    except Exception as e:
-        print(f"Ошибка поиска для {trustee_name}: {e}")
-    
-    return trades
-
-
-def get_all_trades():
-    """Получение всех торгов для всех управляющих"""
-    all_trades = []
-    
-    driver = create_driver()
-    if not driver:
-        print("Не удалось создать драйвер")
-        return all_trades
-    
-    try:
-        for trustee_name in TRUSTEE_NAMES:
-            print(f"\nПоиск торгов для: {trustee_name}")
-            trades = search_trades_by_trustee(driver, trustee_name)
-            all_trades.extend(trades)
-            time.sleep(2)  # Пауза между запросами
-        
-        # Удаляем дубликаты по GUID
-        seen_guids = set()
-        unique_trades = []
-        for trade in all_trades:
-            if trade['guid'] and trade['guid'] not in seen_guids:
-                seen_guids.add(trade['guid'])
-                unique_trades.append(trade)
-            elif not trade['guid']:
-                unique_trades.append(trade)
-        
-        print(f"\nВсего уникальных торгов: {len(unique_trades)}")
-        return unique_trades
-        
-    except Exception as e:
-        print(f"Ошибка: {e}")
-        return all_trades
-    finally:
-        driver.quit()
-
-
-def save_trades_to_json(trades, filename='trades_fedresurs.json'):
-    """Сохранение торгов в JSON файл"""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(trades, f, ensure_ascii=False, indent=2)
-    print(f"Сохранено {len(trades)} торгов в {filename}")
-
-
-if __name__ == '__main__':
-    print("=== Парсер банкротных торгов с fedresurs.ru ===")
-    print(f"Дата фильтра: не ранее {MIN_DATE.strftime('%d.%m.%Y')}")
-    print(f"Управляющие: {len(TRUSTEE_NAMES)}")
-    
-    trades = get_all_trades()
-    
-    if trades:
-        save_trades_to_json(trades)
-        print("\nНайденные торги:")
-        for i, trade in enumerate(trades[:5], 1):
-            print(f"{i}. {trade.get('debtor_name', 'N/A')} - {trade.get('lot_number', 'N/A')}")
-            print(f"   Дата: {trade.get('publish_date', 'N/A')}")
-            print(f"   Управляющий: {trade.get('trustee_name', 'N/A')}")
-            print()
-    else:
-        print("Торги не найдены")
+"""
+Парсер банкротных торгов с bankrot.fedresurs.ru
+Использует Selenium для получения данных из SPA приложения
+"""
+
+import asyncio
+import json
+import os
+import time
+import re
+import threading
+from queue import Queue, Empty
+from urllib.parse import urlparse
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from metrics import (
+    STAGE_SECONDS, TRUSTEE_SCRAPE_SECONDS, TRADES_FOUND, TRUSTEE_ERRORS, UNCHANGED_PAGES, PAGE_REQUESTS, PAGE_BYTES
+)
+from trustee_state import get_trustee_state
+from trustee_index import TrusteeIndex
+from seen_store import lot_key
+from trade_history import TradeHistory, TRADE_HISTORY_DB
+from parser_common import (  # noqa: F401 — реэкспорт для прежних импортов
+    TRUSTEE_NAMES, TRUSTEES_FILE, MIN_DATE, FEDRESURS_URL, PARSER_CONCURRENCY, HOST_MIN_INTERVAL, MAX_PAGES,
+    BROAD_SEARCH_URL, BROAD_MAX_PAGES, BROAD_STATE_KEY,
+    parse_date, is_recent, is_blank, reached_known_trades, update_high_water, broad_date_from, group_by_trustee,
+    deduplicate_trades,
+)
+
+
+# Ожидание результатов поиска: жёсткий предел, окно тишины DOM и шаг опроса, секунд
+RESULTS_TIMEOUT = float(os.getenv('PARSER_RESULTS_TIMEOUT', '20'))
+RESULTS_QUIET = float(os.getenv('PARSER_RESULTS_QUIET', '0.7'))
+RESULTS_POLL_INTERVAL = 0.1
+
+# Прежняя фиксированная пауза после поиска — для оценки сэкономленного времени
+LEGACY_RESULTS_WAIT = 5
+
+TRADE_ROW_SELECTOR = '.trade-item, .lot-item, [class*="trade"], [class*="lot"]'
+# GUID торга в ссылке: параметр guid= или UUID в пути торга (/bidding/<uuid>, /trades/<uuid>).
+# UUID в ссылках на карточки должника, лица или управляющего — не GUID торга
+GUID_PATTERN = re.compile(
+    r'guid=([0-9a-f-]+)|/(?:bidding|trades)/([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})(?=[/?#]|$)',
+    re.I
+)
+NO_RESULTS_SELECTOR = '.no-results, .empty-result, [class*="no-result"], [class*="not-found"], [class*="empty"]'
+NO_RESULTS_TEXT = 'ничего не найдено'
+
+# Кнопка следующей страницы / "показать ещё"
+NEXT_PAGE_SELECTOR = (
+    'a[rel="next"], [class*="pagination"] [class*="next"]:not([class*="disabled"]), '
+    'button[class*="more"], button[class*="next"]'
+)
+
+# Поля строки торга и их селекторы внутри строки
+FIELD_SELECTORS = {
+    'debtor_name': '.debtor-name, [class*="debtor"]',
+    'lot_number': '.lot-number, [class*="lot"]',
+    'description': '.description, [class*="desc"]',
+    'publish_date': '.date, [class*="date"], [class*="publish"]',
+    'arbitr_manager': '.arbitr-manager, [class*="arbitr"], [class*="manager"]',
+}
+
+# Поля, по которым вложенное совпадение сравнивается со строкой (collapse_rows)
+ROW_FIELDS = (*FIELD_SELECTORS, 'url')
+
+# Пакетное извлечение: все строки и поля за один вызов, результат — JSON-массив.
+# Вложенные совпадения TRADE_ROW_SELECTOR (список строк, поля с "lot" в классе) отдаются как есть,
+# вместе со всеми ссылками строки; отсеивает их collapse_rows()
+EXTRACT_ROWS_JS = '''
+    var fields = arguments[1];
+    var rows = document.querySelectorAll(arguments[0]);
+    return Array.prototype.map.call(rows, function (row) {
+        var result = {};
+        Object.keys(fields).forEach(function (field) {
+            var el = row.querySelector(fields[field]);
+            result[field] = el ? (el.innerText || '').trim() : '';
+        });
+        result.links = Array.prototype.map.call(row.querySelectorAll('a[href]'), function (a) { return a.href; });
+        result.url = result.links.length ? result.links[0] : '';
+        return result;
+    });
+'''
+
+# Отпечаток страницы результатов: число строк и FNV-1a от ссылок и текста строк.
+# Считается в браузере, в Python приходит короткая строка
+FINGERPRINT_JS = '''
+    var rows = document.querySelectorAll(arguments[0]);
+    var hash = 0x811c9dc5;
+    Array.prototype.forEach.call(rows, function (row) {
+        var link = row.querySelector('a');
+        var text = (link ? link.href : '') + '\\n' + row.textContent + '\\n';
+        for (var i = 0; i < text.length; i++) {
+            hash ^= text.charCodeAt(i);
+            hash = Math.imul(hash, 0x01000193) >>> 0;
+        }
+    });
+    return rows.length + ':' + hash.toString(16);
+'''
+
+# Наблюдатель за изменениями DOM: запоминает время последней мутации
+INSTALL_OBSERVER_JS = '''
+    if (window.__bpObserver) { window.__bpObserver.disconnect(); }
+    window.__bpLastMutation = null;
+    window.__bpInstalled = performance.now();
+    window.__bpObserver = new MutationObserver(function () {
+        window.__bpLastMutation = performance.now();
+    });
+    window.__bpObserver.observe(document.body, {childList: true, subtree: true, characterData: true});
+'''
+
+# Счётчик незавершённых XHR/fetch страницы — признак того, что результаты ещё загружаются.
+# Внедряется в каждый новый документ при создании драйвера
+NETWORK_TRACKER_JS = '''
+    (function () {
+        window.__bpPending = 0;
+        var done = function () { window.__bpPending = Math.max(0, window.__bpPending - 1); };
+        var send = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function () {
+            window.__bpPending++;
+            this.addEventListener('loadend', done);
+            try {
+                return send.apply(this, arguments);
+            } catch (e) {
+                done();
+                throw e;
+            }
+        };
+        if (window.fetch) {
+            var fetch = window.fetch;
+            window.fetch = function () {
+                window.__bpPending++;
+                return fetch.apply(this, arguments).finally(done);
+            };
+        }
+    })();
+'''
+
+# Строки считаются без обёрток: совпадение, внутри которого есть совпадения со ссылками, —
+# список результатов, а не строка
+READINESS_JS = '''
+    var last = window.__bpLastMutation;
+    var marker = document.querySelector(arguments[1]);
+    var text = (document.body.innerText || '').toLowerCase();
+    var matched = Array.prototype.slice.call(document.querySelectorAll(arguments[0]));
+    var rows = matched.filter(function (el) {
+        if (!(el.innerText || '').trim()) { return false; }
+        return !matched.some(function (other) {
+            return other !== el && el.contains(other) && other.querySelector('a[href]') !== null;
+        });
+    });
+    return {
+        observed: window.__bpObserver !== undefined,
+        pending: window.__bpPending || 0,
+        rows: rows.length,
+        empty: (marker !== null && marker.offsetParent !== null) || text.indexOf(arguments[2]) !== -1,
+        mutated: last !== null,
+        quiet_ms: performance.now() - (last === null ? window.__bpInstalled : last)
+    };
+'''
+
+# Блокировка ресурсов браузера (CDP Network.setBlockedURLs): картинки, шрифты, медиа и счётчики
+# не загружаются. Стили не блокируются по умолчанию — от них зависит видимость элементов страницы
+BLOCK_RESOURCES = os.getenv('PARSER_BLOCK_RESOURCES', '1') == '1'
+BLOCKED_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'woff', 'woff2', 'ttf', 'otf', 'eot', 'mp4', 'webm')
+BLOCKED_URL_PATTERNS = (
+    [pattern for ext in BLOCKED_EXTENSIONS for pattern in (f'*.{ext}', f'*.{ext}?*')]
+    + ['*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+       '*mc.yandex.ru*', '*an.yandex.ru*', '*top-fwz1.mail.ru*', '*vk.com/rtrg*']
+    # Дополнительные шаблоны через запятую, например *.css
+    + [pattern.strip() for pattern in os.getenv('PARSER_BLOCKED_URLS', '').split(',') if pattern.strip()]
+)
+# Хосты, к которым браузеру можно обращаться (через запятую); остальные не резолвятся. Пусто — без ограничения
+ALLOWED_HOSTS = [host.strip() for host in os.getenv('PARSER_ALLOWED_HOSTS', '').split(',') if host.strip()]
+WINDOW_SIZE = os.getenv('PARSER_WINDOW_SIZE', '1366,768')
+
+# Пул драйверов: путь к chromedriver (иначе webdriver-manager), лимиты переиспользования
+CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH')
+DRIVER_MAX_USES = int(os.getenv('DRIVER_MAX_USES', '50'))
+DRIVER_MAX_RSS_MB = int(os.getenv('DRIVER_MAX_RSS_MB', '800'))
+
+# Статистика ожидания результатов по управляющим
+WAIT_STATS = {}
+_wait_stats_lock = threading.Lock()
+
+
+class HostThrottle:
+    """Вежливость к сайту: не чаще одного запроса к хосту за min_interval секунд"""
+
+    def __init__(self, min_interval=HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def resolve_chromedriver():
+    """Путь к chromedriver: из CHROMEDRIVER_PATH либо через webdriver-manager"""
+    return CHROMEDRIVER_PATH or ChromeDriverManager().install()
+
+
+def create_driver(driver_path=None):
+    """Создание драйвера Chrome с настройками для headless режима"""
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')  # Без GUI
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument(f'--window-size={WINDOW_SIZE}')
+    if ALLOWED_HOSTS:
+        rules = ', '.join(['MAP * ~NOTFOUND'] + [f'EXCLUDE {host}' for host in ALLOWED_HOSTS])
+        chrome_options.add_argument(f'--host-resolver-rules={rules}')
+    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+    
+    # Отключаем автоматизацию
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    
+    # Сетевые события в журнале производительности — для подсчёта запросов и байтов на поиск
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+    
+    try:
+        driver = webdriver.Chrome(service=Service(driver_path or resolve_chromedriver()), options=chrome_options)
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+            'source': '''
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined
+                })
+            '''
+        })
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': NETWORK_TRACKER_JS})
+        if BLOCK_RESOURCES:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        return driver
+    except Exception as e:
+        print(f"Ошибка создания драйвера: {e}")
+        return None
+
+
+def read_network_usage(driver):
+    """
+    Запросы, загруженные байты и заблокированные запросы страницы с прошлого вызова
+    (журнал производительности при чтении очищается); None, если журнал недоступен
+    """
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        return None
+    usage = {'requests': 0, 'bytes': 0, 'blocked': 0}
+    for entry in entries:
+        message = json.loads(entry['message']).get('message', {})
+        method = message.get('method')
+        if method == 'Network.requestWillBeSent':
+            usage['requests'] += 1
+        elif method == 'Network.loadingFinished':
+            usage['bytes'] += int(message.get('params', {}).get('encodedDataLength', 0))
+        elif method == 'Network.loadingFailed' and message.get('params', {}).get('blockedReason'):
+            usage['blocked'] += 1
+    return usage
+
+
+def log_network_usage(driver, label):
+    """Трафик браузера за поиск: в лог и в метрики"""
+    usage = read_network_usage(driver)
+    if usage is None:
+        return
+    PAGE_REQUESTS.inc(usage['requests'] - usage['blocked'], trustee=label, result='loaded')
+    PAGE_REQUESTS.inc(usage['blocked'], trustee=label, result='blocked')
+    PAGE_BYTES.inc(usage['bytes'], trustee=label)
+    print(f"Трафик для {label}: {usage['requests']} запросов (заблокировано {usage['blocked']}), "
+          f"{usage['bytes'] / 1024:.0f} КБ")
+
+
+def _process_tree_rss_mb(root_pid):
+    """Суммарный RSS процесса и всех его потомков в МБ (Linux, через /proc)"""
+    if not os.path.isdir('/proc'):
+        return 0
+    children = {}
+    rss_pages = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        pid = int(entry)
+        children.setdefault(int(fields[1]), []).append(pid)
+        rss_pages[pid] = int(fields[21])
+
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+class DriverPool:
+    """
+    Долгоживущий пул прогретых драйверов Chrome.
+    Путь к chromedriver определяется один раз; перед выдачей драйвер проверяется,
+    после DRIVER_MAX_USES использований или превышения DRIVER_MAX_RSS_MB
+    браузер перезапускается.
+    """
+
+    def __init__(self, max_uses=DRIVER_MAX_USES, max_rss_mb=DRIVER_MAX_RSS_MB, max_idle=PARSER_CONCURRENCY):
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.max_idle = max(1, max_idle)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._uses = {}
+        self._driver_path = None
+
+    def warm_up(self):
+        """Определение пути к chromedriver (вызывать при старте сервиса)"""
+        with self._lock:
+            if not self._driver_path:
+                self._driver_path = resolve_chromedriver()
+        return self._driver_path
+
+    def acquire(self):
+        """Выдать исправный драйвер: из пула или новый"""
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                with STAGE_SECONDS.time(stage='driver_startup'):
+                    driver = create_driver(self.warm_up())
+                if driver:
+                    self._uses[id(driver)] = 0
+                return driver
+            if self._is_healthy(driver):
+                return driver
+            self._discard(driver, 'не отвечает')
+
+    def release(self, driver):
+        """Вернуть драйвер в пул либо перезапустить по лимитам"""
+        uses = self._uses.get(id(driver), 0) + 1
+        self._uses[id(driver)] = uses
+        if uses >= self.max_uses:
+            self._discard(driver, f'{uses} использований')
+            return
+        rss_mb = self._rss_mb(driver)
+        if rss_mb > self.max_rss_mb:
+            self._discard(driver, f'RSS {rss_mb:.0f} МБ')
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(driver)
+                return
+        self._discard(driver, 'пул заполнен')
+
+    def close(self):
+        """Закрыть все простаивающие драйверы"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver, 'остановка')
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _rss_mb(driver):
+        try:
+            return _process_tree_rss_mb(driver.service.process.pid)
+        except Exception:
+            return 0
+
+    def _discard(self, driver, reason):
+        print(f"Перезапуск драйвера: {reason}")
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Ошибка закрытия драйвера: {e}")
+
+
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Общий пул драйверов процесса (переживает итерации main)"""
+    global _driver_pool
+    with _driver_pool_lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool()
+        return _driver_pool
+
+
+def close_driver_pool():
+    """Закрыть все драйверы пула"""
+    global _driver_pool
+    with _driver_pool_lock:
+        pool, _driver_pool = _driver_pool, None
+    if pool:
+        pool.close()
+
+
+def watch_results(driver):
+    """Начать наблюдение за DOM (вызывать до отправки поискового запроса)"""
+    try:
+        driver.execute_script(INSTALL_OBSERVER_JS)
+    except Exception as e:
+        print(f"Не удалось установить наблюдатель DOM: {e}")
+
+
+def wait_for_results(driver, timeout=None, quiet=None, after_click=False):
+    """
+    Ожидание готовности результатов вместо фиксированной паузы.
+    Готово, когда после поиска DOM затих на quiet секунд, у страницы нет незавершённых
+    XHR/fetch и на ней есть строки результатов либо маркер "ничего не найдено".
+    after_click — результаты ждём после клика на той же странице: пока DOM не изменился
+    и не было перехода на новую страницу, на ней прежние (или ещё пустые) результаты.
+    Возвращает (причина, затраченные секунды).
+    """
+    timeout = RESULTS_TIMEOUT if timeout is None else timeout
+    quiet = RESULTS_QUIET if quiet is None else quiet
+    started = time.monotonic()
+    navigated = False
+
+    while True:
+        try:
+            state = driver.execute_script(READINESS_JS, TRADE_ROW_SELECTOR, NO_RESULTS_SELECTOR, NO_RESULTS_TEXT)
+        except Exception:
+            state = None
+
+        if state:
+            if not state['observed']:
+                # Страница перезагрузилась — наблюдатель нужно поставить заново
+                watch_results(driver)
+                navigated = True
+            elif after_click and not (state['mutated'] or navigated):
+                # Клик ещё не изменил страницу — результаты на ней устаревшие
+                pass
+            elif not state['pending']:
+                # Без единой мутации (результаты успели отрисоваться до установки
+                # наблюдателя) требуем более длинное окно тишины
+                required_ms = quiet * 1000 if state['mutated'] else quiet * 3000
+                if state['quiet_ms'] >= required_ms:
+                    if state['empty']:
+                        reason = 'no_results'
+                        break
+                    if state['rows']:
+                        reason = 'stable'
+                        break
+
+        if time.monotonic() - started >= timeout:
+            reason = 'timeout'
+            break
+        time.sleep(RESULTS_POLL_INTERVAL)
+
+    return reason, time.monotonic() - started
+
+
+def record_wait(trustee_name, seconds, reason):
+    """Учёт времени ожидания результатов"""
+    with _wait_stats_lock:
+        stats = WAIT_STATS.setdefault(trustee_name, {
+            'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0, 'no_results': 0
+        })
+        stats['count'] += 1
+        stats['total'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+        if reason == 'timeout':
+            stats['timeouts'] += 1
+        elif reason == 'no_results':
+            stats['no_results'] += 1
+
+
+def get_wait_stats():
+    """Сводка ожидания по управляющим: среднее, максимум и экономия относительно паузы в 5 с"""
+    with _wait_stats_lock:
+        summary = {}
+        for trustee_name, stats in WAIT_STATS.items():
+            summary[trustee_name] = {
+                'count': stats['count'],
+                'avg': round(stats['total'] / stats['count'], 3),
+                'max': round(stats['max'], 3),
+                'timeouts': stats['timeouts'],
+                'no_results': stats['no_results'],
+                'saved': round(stats['count'] * LEGACY_RESULTS_WAIT - stats['total'], 3),
+            }
+        return summary
+
+
+def page_fingerprint(driver):
+    """Отпечаток текущей страницы результатов; None, если посчитать не удалось"""
+    try:
+        return driver.execute_script(FINGERPRINT_JS, TRADE_ROW_SELECTOR)
+    except Exception as e:
+        print(f"Не удалось посчитать отпечаток страницы: {e}")
+        return None
+
+
+def extract_rows(driver):
+    """Все поля всех строк результатов за один вызов execute_script"""
+    return driver.execute_script(EXTRACT_ROWS_JS, TRADE_ROW_SELECTOR, FIELD_SELECTORS)
+
+
+def extract_rows_per_element(driver):
+    """Поэлементное извлечение через WebDriver (запасной путь, около пяти RPC на строку)"""
+    rows = []
+    for element in driver.find_elements(By.CSS_SELECTOR, TRADE_ROW_SELECTOR):
+        try:
+            row = {field: '' for field in FIELD_SELECTORS}
+            for field, selector in FIELD_SELECTORS.items():
+                found = element.find_elements(By.CSS_SELECTOR, selector)
+                if found:
+                    row[field] = found[0].text
+            row['links'] = [link.get_attribute('href') or '' for link in element.find_elements(By.CSS_SELECTOR, 'a[href]')]
+            row['url'] = row['links'][0] if row['links'] else ''
+            rows.append(row)
+        except Exception as e:
+            print(f"Ошибка обработки элемента торга: {e}")
+    return rows
+
+
+def link_guid(url):
+    """GUID торга из ссылки или '' (ссылки на карточки должника и управляющего GUID торга не дают)"""
+    guid_match = GUID_PATTERN.search(url or '')
+    return (guid_match.group(1) or guid_match.group(2)).lower() if guid_match else ''
+
+
+def row_guids(row):
+    """Разные GUID торгов в ссылках строки"""
+    return {guid for guid in map(link_guid, row.get('links') or [row.get('url') or '']) if guid}
+
+
+def collapse_rows(rows):
+    """
+    Строки торгов из совпадений TRADE_ROW_SELECTOR, который находит и список строк, и поля внутри строки.
+    Отбрасываются совпадения со ссылками на разные торги (список, контейнер страницы) и совпадения
+    без GUID, все непустые поля которых есть в другой, более полной строке (ячейка или поле строки).
+    Обёртка и сама строка дают один ключ торга — повтор отсеивается по lot_key.
+    """
+    rows = [row for row in rows if len(row_guids(row)) <= 1]
+    filled = [{field: row[field] for field in ROW_FIELDS if row.get(field)} for row in rows]
+    collapsed = []
+    for i, row in enumerate(rows):
+        if filled[i] and not row_guids(row) and any(
+            len(other) > len(filled[i]) and all(other.get(field) == value for field, value in filled[i].items())
+            for other in filled
+        ):
+            continue
+        collapsed.append(row)
+    return collapsed
+
+
+def row_to_trade(row, trustee_name):
+    """Строка страницы -> словарь торга с GUID из ссылки на торг (не обязательно первой в строке)"""
+    trade_data = {
+        'trustee_name': trustee_name,
+        'debtor_name': row.get('debtor_name') or '',
+        'lot_number': row.get('lot_number') or '',
+        'description': row.get('description') or '',
+        'publish_date': row.get('publish_date') or '',
+        'guid': '',
+        'url': row.get('url') or ''
+    }
+    # Извлекаем GUID из той ссылки строки, что ведёт на торг; она же — ссылка торга
+    for url in row.get('links') or [trade_data['url']]:
+        guid = link_guid(url)
+        if guid:
+            trade_data['guid'], trade_data['url'] = guid, url
+            break
+    return trade_data
+
+
+def rows_to_trades(rows, trustee_name):
+    """Строки страницы -> словари торгов с фильтром по MIN_DATE"""
+    return [
+        trade for trade in (row_to_trade(row, trustee_name) for row in rows)
+        if not is_blank(trade) and is_recent(trade)
+    ]
+
+
+def open_next_page(driver, throttle=None):
+    """Перейти к следующей странице результатов; False, если её нет"""
+    for button in driver.find_elements(By.CSS_SELECTOR, NEXT_PAGE_SELECTOR):
+        try:
+            if not (button.is_displayed() and button.is_enabled()):
+                continue
+            if throttle:
+                throttle.wait(driver.current_url)
+            watch_results(driver)
+            button.click()
+            return True
+        except Exception:
+            continue
+    return False
+
+
+def wait_for_page(driver, label, page, after_click=False):
+    """Дождаться готовности страницы результатов и записать время ожидания"""
+    reason, waited = wait_for_results(driver, after_click=after_click)
+    record_wait(label, waited, reason)
+    STAGE_SECONDS.observe(waited, stage='page_wait')
+    print(f"Результаты для {label}, стр. {page}: {reason} за {waited:.2f} с")
+
+
+def read_rows(driver):
+    """Строки страницы одним запросом к браузеру, при ошибке — поэлементно; вложенные совпадения схлопнуты"""
+    with STAGE_SECONDS.time(stage='extraction'):
+        try:
+            rows = extract_rows(driver)
+        except Exception as e:
+            print(f"Пакетное извлечение не удалось, читаем поэлементно: {e}")
+            rows = extract_rows_per_element(driver)
+        return collapse_rows(rows)
+
+
+def search_trades_by_trustee(driver, trustee_name, throttle=None, known_guids=None, failed=None):
+    """
+    Поиск торгов по имени управляющего.
+    Страницы результатов обходятся, пока не встретится уже известный торг
+    (known_guids или отметка прошлого запуска) либо торг старше MIN_DATE.
+    При ошибке управляющий добавляется в список failed.
+    """
+    trades = []
+    started = time.monotonic()
+    # Сетевые события прошлых поисков этим драйвером не относятся к этому
+    read_network_usage(driver)
+    
+    try:
+        # Открываем страницу торгов
+        url = f'{FEDRESURS_URL}/trades'
+        if throttle:
+            throttle.wait(url)
+        driver.get(url)
+        
+        # Ждем загрузки страницы
+        wait = WebDriverWait(driver, 30)
+        
+        # Ищем поле поиска (может быть разное в зависимости от версии сайта)
+        try:
+            # Пробуем найти поле поиска по управляющему
+            search_input = wait.until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 'input[placeholder*="управляющий"], input[placeholder*="Управляющий"], input[name*="trustee"], input[name*="arbitr"]'))
+            )
+            search_input.clear()
+            search_input.send_keys(trustee_name)
+            
+            # Ищем кнопку поиска
+            search_button = driver.find_element(By.CSS_SELECTOR, 'button[type="submit"], button.search-btn, .search-button')
+            watch_results(driver)
+            search_button.click()
+            clicked = True
+            
+        except Exception as e:
+            print(f"Не удалось найти поле поиска для {trustee_name}: {e}")
+            # Пробуем альтернативный способ - через URL параметры
+            search_url = f'{FEDRESURS_URL}/trades?search={trustee_name.replace(" ", "%20")}'
+            if throttle:
+                throttle.wait(search_url)
+            driver.get(search_url)
+            watch_results(driver)
+            clicked = False
+        
+        state = get_trustee_state()
+        high_water = state.get(trustee_name, 'high_water')
+        fingerprint = None
+        collected = set()
+        page = 1
+        while True:
+            # Ждем готовности результатов (после клика — только изменившейся страницы)
+            wait_for_page(driver, trustee_name, page, after_click=clicked or page > 1)
+            
+            # Первая страница не изменилась с прошлого успешного поиска — новых торгов нет
+            if page == 1:
+                with STAGE_SECONDS.time(stage='fingerprint'):
+                    fingerprint = page_fingerprint(driver)
+                if fingerprint and fingerprint == state.get(trustee_name, 'page_fingerprint'):
+                    print(f"Страница результатов для {trustee_name} не изменилась, извлечение пропущено")
+                    UNCHANGED_PAGES.inc(trustee=trustee_name)
+                    break
+            
+            rows = read_rows(driver)
+            
+            # При подгрузке "показать ещё" прежние строки остаются на странице
+            page_trades = []
+            for trade in (row_to_trade(row, trustee_name) for row in rows):
+                key = lot_key(trade)
+                if not is_blank(trade) and key not in collected:
+                    collected.add(key)
+                    page_trades.append(trade)
+            trades.extend(trade for trade in page_trades if is_recent(trade))
+            
+            if not page_trades or reached_known_trades(page_trades, known_guids, high_water):
+                break
+            if page >= MAX_PAGES or not open_next_page(driver, throttle):
+                break
+            page += 1
+        
+        update_high_water(trustee_name, trades)
+        if fingerprint:
+            state.stage(trustee_name, page_fingerprint=fingerprint)
+        print(f"Найдено {len(trades)} торгов для {trustee_name} ({page} стр.)")
+        TRADES_FOUND.inc(len(trades), trustee=trustee_name)
+        
+    except Exception as e:
+        print(f"Ошибка поиска для {trustee_name}: {e}")
+        TRUSTEE_ERRORS.inc(trustee=trustee_name)
+        if failed is not None:
+            failed.append(trustee_name)
+    
+    TRUSTEE_SCRAPE_SECONDS.observe(time.monotonic() - started, trustee=trustee_name)
+    log_network_usage(driver, trustee_name)
+    return trades
+
+
+def search_trades_broad(driver, index, throttle=None, known_guids=None):
+    """
+    Широкий запрос: все торги, опубликованные с даты отметки прошлого широкого запроса.
+    Строки сопоставляются с управляющими по индексу имён (TrusteeIndex), страницы
+    обходятся до известного торга — стоимость растёт с числом новых торгов,
+    а не с числом управляющих. Возвращает торги отслеживаемых управляющих.
+    """
+    started = time.monotonic()
+    state = get_trustee_state()
+    high_water = state.get(BROAD_STATE_KEY, 'high_water')
+    url = BROAD_SEARCH_URL.format(base=FEDRESURS_URL, date_from=broad_date_from(high_water))
+    read_network_usage(driver)
+    if throttle:
+        throttle.wait(url)
+    driver.get(url)
+    watch_results(driver)
+
+    collected = set()
+    scanned = []
+    matched = []
+    page = 1
+    while True:
+        wait_for_page(driver, 'широкого запроса', page, after_click=page > 1)
+        page_trades = []
+        for row in read_rows(driver):
+            trade = row_to_trade(row, '')
+            key = lot_key(trade)
+            if is_blank(trade) or key in collected:
+                continue
+            collected.add(key)
+            page_trades.append(trade)
+            if not is_recent(trade):
+                continue
+            # Поле управляющего, а если его нет в разметке — вся строка
+            text = row.get('arbitr_manager') or ' '.join(str(value) for value in row.values())
+            matched.extend(dict(trade, trustee_name=name) for name in index.match(text))
+        scanned.extend(trade for trade in page_trades if is_recent(trade))
+
+        if not page_trades or reached_known_trades(page_trades, known_guids, high_water):
+            break
+        if page >= BROAD_MAX_PAGES or not open_next_page(driver, throttle):
+            break
+        page += 1
+
+    update_high_water(BROAD_STATE_KEY, scanned)
+    for trade in matched:
+        TRADES_FOUND.inc(trustee=trade['trustee_name'])
+    STAGE_SECONDS.observe(time.monotonic() - started, stage='broad_query')
+    log_network_usage(driver, BROAD_STATE_KEY)
+    print(f"Широкий запрос: {len(scanned)} торгов на {page} стр., у отслеживаемых управляющих — {len(matched)}")
+    return matched
+
+
+async def stream_trades_broad(trustee_names=None, known_guids=None, failed=None):
+    """
+    Торги широким запросом одним браузером: пары (управляющий, новые торги).
+    При ошибке все управляющие добавляются в failed.
+    """
+    trustee_names = list(trustee_names or TRUSTEE_NAMES)
+    index = TrusteeIndex(trustee_names)
+    pool = get_driver_pool()
+
+    def run():
+        driver = pool.acquire()
+        if not driver:
+            raise RuntimeError("не удалось создать драйвер")
+        try:
+            return search_trades_broad(driver, index, HostThrottle(), known_guids)
+        finally:
+            pool.release(driver)
+
+    try:
+        trades = await asyncio.get_running_loop().run_in_executor(None, run)
+    except Exception as e:
+        print(f"✗ Ошибка широкого запроса: {e}")
+        TRUSTEE_ERRORS.inc(trustee=BROAD_STATE_KEY)
+        if failed is not None:
+            failed.extend(trustee_names)
+        return
+    for trustee_name, trustee_trades in group_by_trustee(deduplicate_trades(trades), trustee_names):
+        yield trustee_name, trustee_trades
+
+
+def _run_search_workers(trustee_names, concurrency, on_result, known_guids=None, failed=None):
+    """
+    Обход управляющих пулом браузеров.
+    Потоки берут управляющих из общей очереди и на каждый поиск получают драйвер из пула
+    (изолированный контекст): пул проверяет его перед выдачей, а после поиска считает
+    использования и RSS. on_result(trustee_name, trades) вызывается
+    из рабочего потока по мере готовности. Управляющие, поиск по которым не удался
+    или не начался из-за отсутствия драйвера, добавляются в failed.
+    """
+    names = Queue()
+    for trustee_name in trustee_names:
+        names.put(trustee_name)
+    throttle = HostThrottle()
+    pool = get_driver_pool()
+    served = threading.Event()
+
+    def worker():
+        while True:
+            try:
+                trustee_name = names.get_nowait()
+            except Empty:
+                return
+            driver = pool.acquire()
+            if driver:
+                served.set()
+            else:
+                # Управляющий остаётся в очереди: его заберёт поток с рабочим драйвером
+                print("Не удалось создать драйвер")
+                names.put(trustee_name)
+                return
+            try:
+                print(f"\nПоиск торгов для: {trustee_name}")
+                on_result(trustee_name, search_trades_by_trustee(driver, trustee_name, throttle, known_guids, failed))
+            finally:
+                pool.release(driver)
+
+    concurrency = max(1, min(concurrency, len(trustee_names)))
+    if concurrency == 1:
+        worker()
+    else:
+        threads = [threading.Thread(target=worker, name=f'fedresurs-{i}', daemon=True) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # Возвращённых в очередь после того, как исправные потоки закончили, дообходим здесь
+    if served.is_set() and not names.empty():
+        worker()
+
+    # Не обработанные ни одним потоком (драйверы не создались)
+    while failed is not None and not names.empty():
+        failed.append(names.get_nowait())
+
+
+def get_all_trades(trustee_names=None, concurrency=None, known_guids=None):
+    """Получение всех торгов для всех управляющих"""
+    trustee_names = list(trustee_names or TRUSTEE_NAMES)
+    if concurrency is None:
+        concurrency = PARSER_CONCURRENCY
+
+    results = {}
+
+    def collect(trustee_name, trades):
+        results[trustee_name] = trades
+
+    failed = []
+    try:
+        _run_search_workers(trustee_names, concurrency, collect, known_guids, failed)
+    except Exception as e:
+        print(f"Ошибка: {e}")
+    state = get_trustee_state()
+    state.commit([name for name in results if name not in failed])
+    state.flush()
+
+    # Склеиваем в порядке TRUSTEE_NAMES, чтобы результат совпадал с последовательным обходом
+    all_trades = [trade for name in trustee_names for trade in results.get(name, [])]
+    unique_trades = deduplicate_trades(all_trades)
+    print(f"\nВсего уникальных торгов: {len(unique_trades)}")
+    log_wait_stats()
+    return unique_trades
+
+
+async def stream_trades(trustee_names=None, concurrency=None, known_guids=None, failed=None):
+    """
+    Асинхронный поток торгов: поиск идёт в рабочих потоках вне event loop,
+    пары (управляющий, новые торги) выдаются сразу по готовности каждого управляющего.
+    Управляющие, по которым поиск не удался, добавляются в список failed.
+    """
+    trustee_names = list(trustee_names or TRUSTEE_NAMES)
+    if concurrency is None:
+        concurrency = PARSER_CONCURRENCY
+
+    loop = asyncio.get_running_loop()
+    results = asyncio.Queue()
+    finished = object()
+
+    def on_result(trustee_name, trades):
+        loop.call_soon_threadsafe(results.put_nowait, (trustee_name, trades))
+
+    def run():
+        try:
+            _run_search_workers(trustee_names, concurrency, on_result, known_guids, failed)
+        except Exception as e:
+            print(f"Ошибка: {e}")
+        finally:
+            loop.call_soon_threadsafe(results.put_nowait, finished)
+
+    loop.run_in_executor(None, run)
+    seen_keys = set()
+    while True:
+        item = await results.get()
+        if item is finished:
+            break
+        trustee_name, trades = item
+        yield trustee_name, deduplicate_trades(trades, seen_keys)
+    log_wait_stats()
+
+
+def log_wait_stats():
+    """Вывод статистики ожидания результатов"""
+    for trustee_name, stats in get_wait_stats().items():
+        print(f"Ожидание {trustee_name}: среднее {stats['avg']} с, макс. {stats['max']} с, "
+              f"таймаутов {stats['timeouts']}, сэкономлено {stats['saved']} с")
+
+
+def save_trades_to_history(trades, path=TRADE_HISTORY_DB):
+    """Дописать торги в историю (trade_history.db); известные ранее пропускаются"""
+    history = TradeHistory(path)
+    try:
+        added = history.append(trades)
+    finally:
+        history.close()
+    print(f"В историю {path} добавлено {added} из {len(trades)} торгов")
+
+
+if __name__ == '__main__':
+    print("=== Парсер банкротных торгов с fedresurs.ru ===")
+    print(f"Дата фильтра: не ранее {MIN_DATE.strftime('%d.%m.%Y')}")
+    print(f"Управляющие: {len(TRUSTEE_NAMES)}")
+    
+    trades = get_all_trades()
+    close_driver_pool()
+    
+    if trades:
+        save_trades_to_history(trades)
+        print("\nНайденные торги:")
+        for i, trade in enumerate(trades[:5], 1):
+            print(f"{i}. {trade.get('debtor_name', 'N/A')} - {trade.get('lot_number', 'N/A')}")
+            print(f"   Дата: {trade.get('publish_date', 'N/A')}")
+            print(f"   Управляющий: {trade.get('trustee_name', 'N/A')}")
+            print()
+    else:
+        print("Торги не найдены")
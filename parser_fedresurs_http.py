@@ -0,0 +1,239 @@
+"""
+Парсер банкротных торгов без браузера
+Обращается напрямую к JSON API, из которого SPA bankrot.fedresurs.ru берёт данные
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+
+import aiohttp
+
+from parser_common import (
+    TRUSTEE_NAMES, PARSER_CONCURRENCY, HOST_MIN_INTERVAL, MAX_PAGES, BROAD_MAX_PAGES, BROAD_STATE_KEY,
+    is_recent, deduplicate_trades, reached_known_trades, update_high_water, broad_date_from, group_by_trustee
+)
+from metrics import STAGE_SECONDS, TRUSTEE_SCRAPE_SECONDS, TRADES_FOUND, TRUSTEE_ERRORS
+from trustee_state import get_trustee_state
+from trustee_index import TrusteeIndex
+
+
+# Адрес API (для тестов можно указать локальный сервер с записанными ответами)
+FEDRESURS_API_URL = os.getenv('FEDRESURS_API_URL', 'https://bankrot.fedresurs.ru/backend').rstrip('/')
+FEDRESURS_TRADES_PATH = os.getenv('FEDRESURS_TRADES_PATH', '/biddings')
+TRADE_URL_TEMPLATE = 'https://bankrot.fedresurs.ru/bidding?guid={guid}'
+PAGE_SIZE = 50
+HTTP_TIMEOUT = 30
+
+# API отвечает только на запросы "со страницы" сайта
+HEADERS = {
+    'Accept': 'application/json, text/plain, */*',
+    'Referer': 'https://bankrot.fedresurs.ru/trades',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+}
+
+
+class FedresursAPIError(Exception):
+    """Ошибка обращения к API fedresurs"""
+
+
+class AsyncHostThrottle:
+    """Асинхронный аналог HostThrottle: не чаще одного запроса за min_interval секунд"""
+
+    def __init__(self, min_interval=HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._next_slot = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def _value(item, *keys):
+    """Первое непустое значение по списку ключей; вложенные ключи через точку"""
+    for key in keys:
+        value = item
+        for part in key.split('.'):
+            value = value.get(part) if isinstance(value, dict) else None
+        if value:
+            return value
+    return ''
+
+
+def _format_date(value):
+    """ISO-дата API -> ДД.ММ.ГГГГ, как на странице сайта"""
+    if not value:
+        return ''
+    try:
+        return datetime.fromisoformat(value[:19]).strftime('%d.%m.%Y')
+    except ValueError:
+        return value
+
+
+def trade_from_json(item, trustee_name):
+    """Преобразование записи API в словарь торга того же вида, что у Selenium-парсера"""
+    guid = _value(item, 'guid', 'tradeGuid', 'id')
+    return {
+        'trustee_name': trustee_name,
+        'debtor_name': _value(item, 'debtor.name', 'debtorName', 'debtor'),
+        'lot_number': str(_value(item, 'lotNumber', 'tradeNumber', 'number')),
+        'description': _value(item, 'lotDescription', 'description', 'tradeObject'),
+        'publish_date': _format_date(_value(item, 'datePublish', 'publishDate', 'date')),
+        'guid': str(guid),
+        'url': TRADE_URL_TEMPLATE.format(guid=guid) if guid else ''
+    }
+
+
+async def fetch_page(session, trustee_name, offset, throttle=None, extra_params=None):
+    """Одна страница результатов API (пустой trustee_name — без фильтра по управляющему)"""
+    params = {'searchString': trustee_name, 'limit': PAGE_SIZE, 'offset': offset, **(extra_params or {})}
+    if throttle:
+        await throttle.wait()
+
+    url = FEDRESURS_API_URL + FEDRESURS_TRADES_PATH
+    try:
+        with STAGE_SECONDS.time(stage='fedresurs_api'):
+            async with session.get(url, params=params, headers=HEADERS, timeout=HTTP_TIMEOUT) as response:
+                if response.status != 200:
+                    raise FedresursAPIError(f"HTTP {response.status} для {trustee_name}")
+                data = await response.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise FedresursAPIError(f"{trustee_name}: {e}") from e
+
+    return data.get('pageData', []) if isinstance(data, dict) else data
+
+
+async def search_trades_http(session, trustee_name, throttle=None, known_guids=None):
+    """
+    Поиск торгов по имени управляющего через API.
+    Страницы запрашиваются, пока не встретится уже известный торг либо торг старше MIN_DATE.
+    """
+    high_water = get_trustee_state().get(trustee_name, 'high_water')
+    trades = []
+    page = 1
+    started = time.monotonic()
+    while True:
+        items = await fetch_page(session, trustee_name, (page - 1) * PAGE_SIZE, throttle)
+        page_trades = [trade_from_json(item, trustee_name) for item in items]
+        trades.extend(trade for trade in page_trades if is_recent(trade))
+        if len(items) < PAGE_SIZE or page >= MAX_PAGES or reached_known_trades(page_trades, known_guids, high_water):
+            break
+        page += 1
+
+    update_high_water(trustee_name, trades)
+    print(f"Найдено {len(trades)} торгов для {trustee_name} (API, {page} стр.)")
+    TRADES_FOUND.inc(len(trades), trustee=trustee_name)
+    TRUSTEE_SCRAPE_SECONDS.observe(time.monotonic() - started, trustee=trustee_name)
+    return trades
+
+
+async def search_trades_broad_http(session, index, throttle=None, known_guids=None):
+    """
+    Широкий запрос через API: все торги с даты отметки прошлого широкого запроса,
+    управляющие сопоставляются по индексу имён. Возвращает торги отслеживаемых управляющих.
+    """
+    started = time.monotonic()
+    high_water = get_trustee_state().get(BROAD_STATE_KEY, 'high_water')
+    extra_params = {'datePublishFrom': broad_date_from(high_water)}
+    scanned = []
+    matched = []
+    page = 1
+    while True:
+        items = await fetch_page(session, '', (page - 1) * PAGE_SIZE, throttle, extra_params)
+        page_trades = []
+        for item in items:
+            trade = trade_from_json(item, '')
+            page_trades.append(trade)
+            if is_recent(trade):
+                scanned.append(trade)
+                manager = _value(item, 'arbitrManager.fio', 'arbitrManager.name', 'arbitrManagerName', 'arbitrManager')
+                matched.extend(dict(trade, trustee_name=name) for name in index.match(str(manager)))
+        if (len(items) < PAGE_SIZE or page >= BROAD_MAX_PAGES
+                or reached_known_trades(page_trades, known_guids, high_water)):
+            break
+        page += 1
+
+    update_high_water(BROAD_STATE_KEY, scanned)
+    for trade in matched:
+        TRADES_FOUND.inc(trustee=trade['trustee_name'])
+    STAGE_SECONDS.observe(time.monotonic() - started, stage='broad_query')
+    print(f"Широкий запрос (API): {len(scanned)} торгов на {page} стр., у отслеживаемых управляющих — {len(matched)}")
+    return matched
+
+
+async def stream_trades_broad_http(session, trustee_names=None, failed=None, known_guids=None):
+    """Пары (управляющий, новые торги) по широкому запросу; при ошибке все управляющие — в failed"""
+    trustee_names = list(trustee_names or TRUSTEE_NAMES)
+    try:
+        trades = await search_trades_broad_http(session, TrusteeIndex(trustee_names), AsyncHostThrottle(), known_guids)
+    except Exception as e:
+        print(f"✗ Ошибка широкого запроса API: {e}")
+        TRUSTEE_ERRORS.inc(trustee=BROAD_STATE_KEY)
+        if failed is not None:
+            failed.extend(trustee_names)
+        return
+    for trustee_name, trustee_trades in group_by_trustee(deduplicate_trades(trades), trustee_names):
+        yield trustee_name, trustee_trades
+
+
+async def stream_trades_http(session, trustee_names=None, concurrency=None, failed=None, known_guids=None):
+    """
+    Асинхронный поток торгов через API: пары (управляющий, новые торги) по мере готовности.
+    Управляющие, по которым запрос не удался, добавляются в список failed.
+    """
+    trustee_names = list(trustee_names or TRUSTEE_NAMES)
+    semaphore = asyncio.Semaphore(concurrency or PARSER_CONCURRENCY)
+    throttle = AsyncHostThrottle()
+
+    async def search(trustee_name):
+        async with semaphore:
+            try:
+                return trustee_name, await search_trades_http(session, trustee_name, throttle, known_guids)
+            except Exception as e:
+                print(f"✗ Ошибка API для {trustee_name}: {e}")
+                TRUSTEE_ERRORS.inc(trustee=trustee_name)
+                if failed is not None:
+                    failed.append(trustee_name)
+                return trustee_name, []
+
+    seen_keys = set()
+    for next_result in asyncio.as_completed([search(name) for name in trustee_names]):
+        trustee_name, trades = await next_result
+        yield trustee_name, deduplicate_trades(trades, seen_keys)
+
+
+async def get_all_trades_http(session, trustee_names=None, concurrency=None):
+    """
+    Получение торгов для всех управляющих через API.
+    Возвращает (уникальные торги, управляющие, по которым запрос не удался) —
+    для последних вызывающий код может повторить поиск через Selenium.
+    """
+    trustee_names = list(trustee_names or TRUSTEE_NAMES)
+    results = {}
+    failed = []
+    async for trustee_name, trades in stream_trades_http(session, trustee_names, concurrency, failed):
+        results[trustee_name] = trades
+    state = get_trustee_state()
+    state.commit([name for name in results if name not in failed])
+    state.flush()
+
+    all_trades = [trade for name in trustee_names for trade in results.get(name, [])]
+    unique_trades = deduplicate_trades(all_trades)
+    print(f"\nВсего уникальных торгов (API): {len(unique_trades)}")
+    return unique_trades, failed
+
+
+if __name__ == '__main__':
+    async def _main():
+        async with aiohttp.ClientSession() as session:
+            trades, failed = await get_all_trades_http(session)
+        for trade in trades:
+            print(f"{trade['publish_date']} {trade['trustee_name']}: {trade['debtor_name']} ({trade['guid']})")
+        if failed:
+            print(f"Не удалось: {', '.join(failed)}")
+
+    asyncio.run(_main())
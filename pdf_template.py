@@ -0,0 +1,79 @@
+"""
+Шаблон PDF-заявки
+Шрифт, стили и неизменный блок заявителя готовятся один раз,
+каждая заявка рендерится в память и сразу уходит во вложение письма
+"""
+
+import copy
+import os
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+
+FONT_NAME = 'SFPro'
+FONT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SFProText-Regular.ttf')
+
+
+class ApplicationTemplate:
+    """
+    Заявка на участие в торгах.
+    applicant — словарь с полями заявителя (name, short_name, birth, inn, ogrnip,
+    address, phone, email); render() потокобезопасен.
+    """
+
+    def __init__(self, applicant, font_file=FONT_FILE):
+        if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont(FONT_NAME, font_file))
+
+        styles = getSampleStyleSheet()
+        # Создаем стили с поддержкой русского языка
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontName=FONT_NAME,
+            fontSize=16,
+            alignment=TA_CENTER,
+            spaceAfter=30
+        )
+        self.normal_style = ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontName=FONT_NAME,
+            fontSize=11,
+            leading=14
+        )
+
+        self._header = [Paragraph("ЗАЯВКА", self.title_style), Spacer(1, 20)]
+        self._applicant = [Paragraph("<b>ИНФОРМАЦИЯ О ЗАЯВИТЕЛЕ:</b>", self.normal_style)]
+        for label, key in (
+            ('ФИО', 'name'), ('Дата рождения', 'birth'), ('ИНН', 'inn'), ('ОГРНИП', 'ogrnip'),
+            ('Адрес', 'address'), ('Телефон', 'phone'), ('Email', 'email'),
+        ):
+            value = escape(applicant.get(key) or 'N/A')
+            self._applicant.append(Paragraph(f"{label}: {value}", self.normal_style))
+        self._applicant.append(Spacer(1, 20))
+        # Подпись
+        self._applicant.append(
+            Paragraph(f"___________________ / {escape(applicant.get('short_name') or '')}", self.normal_style)
+        )
+
+    def render(self, trustee_name, lot_number, debtor_name):
+        """PDF заявки в виде bytes"""
+        story = [copy.copy(flowable) for flowable in self._header]
+        story.append(Paragraph(f"<b>Лот №:</b> {escape(str(lot_number))}", self.normal_style))
+        story.append(Paragraph(f"<b>Должник:</b> {escape(str(debtor_name))}", self.normal_style))
+        story.append(Paragraph(f"<b>Управляющий:</b> {escape(str(trustee_name))}", self.normal_style))
+        story.append(Spacer(1, 20))
+        # Готовые параграфы копируются: wrap() хранит раскладку в самом объекте
+        story.extend(copy.copy(flowable) for flowable in self._applicant)
+
+        buffer = BytesIO()
+        SimpleDocTemplate(buffer, pagesize=letter).build(story)
+        return buffer.getvalue()
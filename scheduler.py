@@ -0,0 +1,152 @@
+"""
+Адаптивное расписание опроса управляющих
+Интервал опроса каждого управляющего подбирается по истории его публикаций:
+активных в рабочие часы опрашиваем часто (до SCHEDULER_MIN_INTERVAL секунд),
+затихших — редко; при ошибках интервал растёт экспоненциально,
+общее число поисков в минуту ограничено SCHEDULER_BUDGET.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from metrics import POLL_INTERVAL
+from trustee_state import get_trustee_state
+
+
+SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', '1') == '1'
+# Интервал для управляющих без истории и при выключенном расписании, секунд
+DEFAULT_INTERVAL = int(os.getenv('CHECK_INTERVAL', '300'))
+MIN_INTERVAL = float(os.getenv('SCHEDULER_MIN_INTERVAL', '30'))
+MAX_INTERVAL = float(os.getenv('SCHEDULER_MAX_INTERVAL', '3600'))
+# Секунд интервала на каждый день типичного промежутка между публикациями:
+# публикующий ежедневно опрашивается раз в 30 с, еженедельно — раз в 3,5 минуты
+SECONDS_PER_GAP_DAY = float(os.getenv('SCHEDULER_SECONDS_PER_GAP_DAY', '30'))
+# Рабочие часы по времени сайта (Москва, UTC+3), вне их и в выходные интервал умножается на OFF_HOURS_FACTOR
+WORK_HOURS = tuple(int(hour) for hour in os.getenv('SCHEDULER_WORK_HOURS', '9-19').split('-'))
+SITE_TIMEZONE = timezone(timedelta(hours=float(os.getenv('SCHEDULER_UTC_OFFSET', '3'))))
+OFF_HOURS_FACTOR = float(os.getenv('SCHEDULER_OFF_HOURS_FACTOR', '6'))
+JITTER = float(os.getenv('SCHEDULER_JITTER', '0.1'))
+# Поисков в минуту по всем управляющим (может быть дробным: 0.5 — один поиск в две минуты)
+BUDGET = float(os.getenv('SCHEDULER_BUDGET', '4'))
+# Сколько дней публикаций помнить по управляющему
+HISTORY_SIZE = 30
+
+
+def parse_publish_date(value):
+    """ДД.ММ.ГГГГ -> date, нераспознанные даты пропускаются"""
+    try:
+        return datetime.strptime(value[:10], '%d.%m.%Y').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def is_work_time(moment):
+    """Рабочее время сайта: будни в пределах WORK_HOURS"""
+    local = moment.astimezone(SITE_TIMEZONE)
+    return local.weekday() < 5 and WORK_HOURS[0] <= local.hour < WORK_HOURS[1]
+
+
+class PollScheduler:
+    """
+    Расписание опроса: due() отдаёт управляющих, которых пора опросить,
+    record_poll() сообщает результат опроса и назначает следующий.
+    Время следующего опроса, число ошибок подряд и дни публикаций хранятся в trustee_state.json.
+    """
+
+    def __init__(self, trustee_names, state=None, budget=BUDGET):
+        self.trustee_names = list(trustee_names)
+        self.state = state or get_trustee_state()
+        self.budget = budget
+        self._lock = threading.Lock()
+        # Моменты выданных поисков за окно бюджета: минута, а при бюджете меньше
+        # одного поиска в минуту — время на один поиск (60 / budget секунд)
+        self._dispatched = deque()
+        self._window = 60 / min(budget, 1) if budget > 0 else 60
+        self._window_limit = max(1, int(budget * self._window / 60))
+
+    def base_interval(self, trustee_name, now=None):
+        """Интервал по истории публикаций и времени суток, без ошибок, джиттера и бюджета"""
+        if not SCHEDULER_ENABLED:
+            return DEFAULT_INTERVAL
+        moment = datetime.fromtimestamp(now or time.time(), SITE_TIMEZONE)
+        dates = sorted(filter(None, map(parse_publish_date, self.state.get(trustee_name, 'publications', []))))
+        if len(dates) < 2:
+            interval = DEFAULT_INTERVAL
+        else:
+            gap_days = (dates[-1] - dates[0]).days / (len(dates) - 1)
+            # Давно молчащий управляющий считается затихшим, даже если раньше публиковал часто
+            gap_days = max(gap_days, (moment.date() - dates[-1]).days, 1)
+            interval = SECONDS_PER_GAP_DAY * gap_days
+        if not is_work_time(moment):
+            interval *= OFF_HOURS_FACTOR
+        return min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+
+    def _budget_factor(self, now):
+        """Во сколько раз растянуть интервалы, чтобы ожидаемая частота поисков уложилась в бюджет"""
+        if not SCHEDULER_ENABLED or self.budget <= 0:
+            return 1.0
+        rate = sum(60 / self.base_interval(name, now) for name in self.trustee_names)
+        return max(1.0, rate / self.budget)
+
+    def interval(self, trustee_name, now=None):
+        """Интервал до следующего опроса с учётом ошибок подряд, бюджета и джиттера"""
+        now = now or time.time()
+        interval = self.base_interval(trustee_name, now) * self._budget_factor(now)
+        failures = self.state.get(trustee_name, 'failures', 0)
+        if failures:
+            interval = min(interval * 2 ** failures, max(MAX_INTERVAL, interval))
+        return interval * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def due(self, now=None):
+        """Управляющие, которых пора опросить, начиная с самых просроченных, в пределах бюджета"""
+        now = now or time.time()
+        with self._lock:
+            while self._dispatched and self._dispatched[0] <= now - self._window:
+                self._dispatched.popleft()
+            overdue = sorted(
+                (self.state.get(name, 'next_poll_at', 0), name) for name in self.trustee_names
+            )
+            names = [name for next_poll_at, name in overdue if next_poll_at <= now]
+            if SCHEDULER_ENABLED and self.budget > 0:
+                names = names[:max(0, self._window_limit - len(self._dispatched))]
+            self._dispatched.extend(now for _ in names)
+            return names
+
+    def record_poll(self, trustee_name, publish_dates=(), ok=True, now=None):
+        """Результат опроса: даты публикаций найденных торгов и признак успеха"""
+        now = now or time.time()
+        fields = {'failures': 0 if ok else self.state.get(trustee_name, 'failures', 0) + 1}
+        known = self.state.get(trustee_name, 'publications', [])
+        # Дни публикаций (не отдельные лоты): несколько лотов за день — одна публикация
+        dates = {date for date in map(parse_publish_date, list(known) + list(publish_dates)) if date}
+        if len(dates) != len(known):
+            fields['publications'] = [date.strftime('%d.%m.%Y') for date in sorted(dates)[-HISTORY_SIZE:]]
+        # Интервал считается по уже обновлённой истории
+        self.state.update(trustee_name, **fields)
+        interval = self.interval(trustee_name, now)
+        self.state.update(trustee_name, next_poll_at=now + interval)
+        POLL_INTERVAL.set(round(interval, 1), trustee=trustee_name)
+        if not ok:
+            print(f"⚠ {trustee_name}: ошибка опроса №{fields['failures']}, следующий через {interval:.0f} с")
+
+    def seconds_until_next(self, now=None):
+        """Сколько ждать до ближайшего запланированного опроса"""
+        now = now or time.time()
+        next_poll_at = min((self.state.get(name, 'next_poll_at', 0) for name in self.trustee_names), default=now)
+        return min(max(next_poll_at - now, 0), MAX_INTERVAL)
+
+    def snapshot(self, now=None):
+        """Расписание для /status: {управляющий: {next_poll_in, failures, publications}}"""
+        now = now or time.time()
+        return {
+            name: {
+                'next_poll_in': round(max(self.state.get(name, 'next_poll_at', 0) - now, 0), 1),
+                'failures': self.state.get(name, 'failures', 0),
+                'publications': len(self.state.get(name, 'publications', [])),
+            }
+            for name in self.trustee_names
+        }
@@ -0,0 +1,228 @@
+"""
+Хранилище обработанных лотов на SQLite
+Проверка "уже видели" — по множеству в памяти, каждая запись сразу сохраняется на диск.
+Лоты без GUID хранятся по отпечатку содержимого строки (lot_key).
+Запись удаляется, только когда дата публикации лота раньше MIN_DATE парсера: такой торг
+отсеивается фильтром даты и уже не может снова прийти как новый.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from trustee_index import normalize_name
+
+
+# Ключ лота без GUID — отпечаток этих полей с префиксом, чтобы не спутать его с GUID
+FINGERPRINT_PREFIX = 'fp:'
+FINGERPRINT_FIELDS = ('trustee_name', 'debtor_name', 'lot_number', 'publish_date')
+
+
+def trade_fingerprint(trade):
+    """Отпечаток торга: хеш нормализованных управляющего, должника, номера лота и даты"""
+    text = '\n'.join(normalize_name(str(trade.get(field) or '')) for field in FINGERPRINT_FIELDS)
+    return FINGERPRINT_PREFIX + hashlib.sha1(text.encode('utf-8')).hexdigest()[:20]
+
+
+def lot_key(trade):
+    """Ключ дедупликации лота: GUID, а если его нет — отпечаток содержимого"""
+    guid = trade.get('guid')
+    if isinstance(guid, dict):
+        guid = guid.get('value')
+    return guid or trade_fingerprint(trade)
+
+
+def iso_date(value):
+    """ДД.ММ.ГГГГ или ГГГГ-ММ-ДД -> ГГГГ-ММ-ДД (строки такого вида сравниваются как даты); иначе None"""
+    for date_format in ('%d.%m.%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime((value or '')[:10], date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def add_publish_date_column(conn, table):
+    """Столбец даты публикации для баз, созданных до его появления"""
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+    if 'publish_date' not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN publish_date TEXT')
+
+
+def is_fingerprint(key):
+    """Ключ — отпечаток, а не GUID (API дел по нему не запросить)"""
+    return str(key).startswith(FINGERPRINT_PREFIX)
+
+
+class SeenStore:
+    """Множество ключей обработанных лотов (GUID или отпечаток) с датой публикации лота для вытеснения"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS seen (guid TEXT PRIMARY KEY, seen_at REAL NOT NULL) WITHOUT ROWID'
+        )
+        add_publish_date_column(self._conn, 'seen')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS seen_publish_idx ON seen (publish_date)')
+        self._guids = {row[0] for row in self._conn.execute('SELECT guid FROM seen')}
+
+    def __contains__(self, guid):
+        return guid in self._guids
+
+    def __len__(self):
+        return len(self._guids)
+
+    def add(self, guid, publish_date=None):
+        """Добавить GUID с датой публикации лота (ДД.ММ.ГГГГ); False, если он уже был"""
+        with self._lock:
+            if guid in self._guids:
+                return False
+            self._conn.execute(
+                'INSERT OR IGNORE INTO seen (guid, seen_at, publish_date) VALUES (?, ?, ?)',
+                (guid, time.time(), iso_date(publish_date))
+            )
+            self._guids.add(guid)
+            return True
+
+    def evict_published_before(self, min_date):
+        """
+        Удалить лоты, опубликованные раньше min_date (ГГГГ-ММ-ДД); возвращает число удалённых.
+        Лоты без распознанной даты (в т. ч. перенесённые из JSON) не удаляются: фильтр даты их пропускает
+        """
+        with self._lock:
+            old = [row[0] for row in self._conn.execute('SELECT guid FROM seen WHERE publish_date < ?', (min_date,))]
+            if old:
+                self._conn.execute('DELETE FROM seen WHERE publish_date < ?', (min_date,))
+                self._guids.difference_update(old)
+        return len(old)
+
+    def migrate_json(self, json_path):
+        """Однократный перенос списка из seen_cases.json; файл переименовывается в *.migrated"""
+        if not os.path.exists(json_path):
+            return 0
+        with open(json_path, 'r') as f:
+            guids = [guid for guid in json.load(f) if guid]
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO seen (guid, seen_at) VALUES (?, ?)', [(guid, now) for guid in guids]
+            )
+            self._conn.execute('COMMIT')
+            self._guids.update(guids)
+        os.replace(json_path, json_path + '.migrated')
+        print(f"✓ Перенесено {len(guids)} GUID из {json_path} в {self.path}")
+        return len(guids)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LotClaims:
+    """
+    Захват лотов в общем для нескольких процессов SQLite (WAL).
+    Процесс-владелец получает аренду на lease_seconds; лот, не отмеченный выполненным
+    до истечения аренды (процесс упал посреди обработки), может забрать другой процесс —
+    вместе с сохранённым при захвате описанием лота.
+    """
+
+    def __init__(self, path, owner, lease_seconds=900, max_attempts=5):
+        self.path = path
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS claims ('
+            'guid TEXT PRIMARY KEY, owner TEXT NOT NULL, lease_until REAL NOT NULL, '
+            'attempts INTEGER NOT NULL DEFAULT 1, done_at REAL, payload TEXT) WITHOUT ROWID'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS claims_lease_idx ON claims (done_at, lease_until)')
+        add_publish_date_column(self._conn, 'claims')
+
+    def claim(self, guid, payload=None, publish_date=None):
+        """
+        Захватить лот; False, если он уже выполнен или его аренда у другого процесса ещё действует.
+        publish_date (ДД.ММ.ГГГГ) сохраняется при первом захвате — по ней выполненный лот вытесняется.
+        Проверка и запись — в одной транзакции BEGIN IMMEDIATE, поэтому захват атомарен между процессами.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    'SELECT owner, lease_until, done_at FROM claims WHERE guid = ?', (guid,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute(
+                        'INSERT INTO claims (guid, owner, lease_until, payload, publish_date) VALUES (?, ?, ?, ?, ?)',
+                        (guid, self.owner, now + self.lease_seconds, json.dumps(payload, ensure_ascii=False),
+                         iso_date(publish_date))
+                    )
+                    claimed = True
+                else:
+                    owner, lease_until, done_at = row
+                    claimed = done_at is None and (owner == self.owner or lease_until < now)
+                    if claimed:
+                        self._conn.execute(
+                            'UPDATE claims SET owner = ?, lease_until = ?, attempts = attempts + 1 WHERE guid = ?',
+                            (self.owner, now + self.lease_seconds, guid)
+                        )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return claimed
+
+    def complete(self, guid):
+        """Отметить лот выполненным (только своим процессом)"""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE claims SET done_at = ? WHERE guid = ? AND owner = ?', (time.time(), guid, self.owner)
+            )
+
+    def reclaim_expired(self, limit=50):
+        """
+        Забрать лоты с истёкшей арендой, не выполненные и не исчерпавшие max_attempts.
+        Возвращает их описания, сохранённые при первом захвате.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._conn.execute(
+                    'SELECT guid, payload FROM claims WHERE done_at IS NULL AND lease_until < ? AND attempts < ? '
+                    'LIMIT ?', (now, self.max_attempts, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    'UPDATE claims SET owner = ?, lease_until = ?, attempts = attempts + 1 WHERE guid = ?',
+                    [(self.owner, now + self.lease_seconds, guid) for guid, _ in rows]
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return [json.loads(payload) for _, payload in rows if payload]
+
+    def evict_published_before(self, min_date):
+        """Удалить выполненные лоты, опубликованные раньше min_date (ГГГГ-ММ-ДД)"""
+        with self._lock:
+            return self._conn.execute(
+                'DELETE FROM claims WHERE done_at IS NOT NULL AND publish_date < ?', (min_date,)
+            ).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
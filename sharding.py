@@ -0,0 +1,60 @@
+"""
+Распределение управляющих между экземплярами сервиса
+Согласованное хеширование: каждый экземпляр (шард) занимает SHARD_VNODES точек на кольце,
+управляющий достаётся ближайшему по часовой стрелке шарду (и SHARD_REPLICAS - 1 следующим).
+При изменении SHARD_COUNT переезжает лишь часть управляющих.
+"""
+
+import bisect
+import hashlib
+import os
+
+
+SHARD_INDEX = int(os.getenv('SHARD_INDEX', '0'))
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '1'))
+# Сколько шардов опрашивают каждого управляющего (больше 1 — дублирование на случай падения шарда)
+SHARD_REPLICAS = int(os.getenv('SHARD_REPLICAS', '1'))
+SHARD_VNODES = 64
+
+
+def _hash(key):
+    """Стабильный между процессами хеш (встроенный hash() для строк рандомизирован)"""
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+def build_ring(shard_count, vnodes=SHARD_VNODES):
+    """Отсортированное кольцо [(точка, шард)]"""
+    return sorted((_hash(f'shard-{shard}-{vnode}'), shard) for shard in range(shard_count) for vnode in range(vnodes))
+
+
+def shards_for(trustee_name, ring, replicas=1):
+    """Шарды, отвечающие за управляющего: первые replicas различных шардов по кольцу"""
+    shard_count = len({shard for _, shard in ring})
+    position = bisect.bisect(ring, (_hash(trustee_name), -1))
+    shards = []
+    for offset in range(len(ring)):
+        shard = ring[(position + offset) % len(ring)][1]
+        if shard not in shards:
+            shards.append(shard)
+            if len(shards) >= min(replicas, shard_count):
+                break
+    return shards
+
+
+def shard_trustees(trustee_names, shard_index=SHARD_INDEX, shard_count=SHARD_COUNT, replicas=SHARD_REPLICAS):
+    """Управляющие, которых опрашивает шард shard_index из shard_count"""
+    if shard_count <= 1:
+        return list(trustee_names)
+    ring = build_ring(shard_count)
+    return [name for name in trustee_names if shard_index in shards_for(name, ring, replicas)]
+
+
+def shard_path(path, shard_index=SHARD_INDEX, shard_count=SHARD_COUNT):
+    """
+    Путь к локальному файлу состояния шарда: 'pending_lots.json' -> 'pending_lots.shard1.json'
+    при SHARD_COUNT > 1, чтобы шарды в одном рабочем каталоге не перезаписывали файлы друг друга
+    """
+    if shard_count <= 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f'{root}.shard{shard_index}{ext}'
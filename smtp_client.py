@@ -0,0 +1,107 @@
+"""
+SMTP-клиент с постоянным соединением
+STARTTLS и вход выполняются один раз, последующие письма идут по тому же
+соединению; при обрыве клиент переподключается
+"""
+
+import smtplib
+import threading
+import time
+
+
+# После такого простоя соединение перед отправкой проверяется командой NOOP, секунд
+NOOP_AFTER_IDLE = 30
+
+
+class _SMTP(smtplib.SMTP):
+    """smtplib.SMTP, запоминающий, что команда DATA уже отправлена"""
+
+    data_started = False
+
+    def data(self, msg):
+        self.data_started = True
+        return super().data(msg)
+
+
+class SMTPClient:
+    """Потокобезопасный клиент: одно аутентифицированное соединение на процесс"""
+
+    def __init__(self, host, port, user=None, password=None, starttls=True, timeout=30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.handshakes = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._last_used = 0.0
+
+    def send(self, from_addr, to_addrs, message):
+        """Отправить письмо (строку или bytes), переподключаясь при обрыве
+
+        Повтор — только если соединение оборвалось до команды DATA: после неё
+        сервер мог уже принять письмо, и повтор дал бы дубликат. Отказ сервера
+        (SMTPRecipientsRefused, SMTPDataError и т. п.) и таймауты не повторяются.
+        """
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    self._ensure_connected()
+                    self._server.data_started = False
+                    self._server.sendmail(from_addr, to_addrs, message)
+                    self._last_used = time.monotonic()
+                    return
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError):
+                    retry = not attempt and not (self._server is not None and self._server.data_started)
+                    self._disconnect()
+                    if not retry:
+                        raise
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+                    # Ответ сервера: sendmail уже сбросил транзакцию (RSET), соединение годно
+                    raise
+                except OSError:
+                    # Таймаут и прочие сбои сокета: состояние соединения неизвестно
+                    self._disconnect()
+                    raise
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    def _ensure_connected(self):
+        if self._server is not None:
+            if time.monotonic() - self._last_used < NOOP_AFTER_IDLE:
+                return
+            try:
+                if self._server.noop()[0] == 250:
+                    return
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._disconnect()
+
+        server = _SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.starttls:
+                server.starttls()
+                server.ehlo()
+            # Без AUTH (локальный SMTP-стенд) вход пропускаем
+            if self.user and server.has_extn('auth'):
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self._last_used = time.monotonic()
+        self.handshakes += 1
+
+    def _disconnect(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
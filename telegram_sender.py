@@ -0,0 +1,131 @@
+"""
+Отправка сообщений в Telegram
+Один бот и одна HTTP-сессия на процесс, очередь исходящих с учётом flood control
+и необязательным объединением лотов в дайджест
+"""
+
+import asyncio
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+from metrics import STAGE_SECONDS
+
+
+# Ограничение Telegram на длину сообщения
+MAX_MESSAGE_LENGTH = 4096
+MAX_ATTEMPTS = 5
+
+
+class TelegramSender:
+    """
+    Очередь исходящих сообщений в один чат.
+    min_interval — пауза между сообщениями в чат, digest_window — окно (секунд),
+    в течение которого сообщения собираются в один дайджест (0 — без дайджеста),
+    api_url — адрес Bot API, если он отличается от api.telegram.org.
+    """
+
+    def __init__(self, token, chat_id, min_interval=1.0, digest_window=0, api_url=None):
+        session = AiohttpSession(api=TelegramAPIServer.from_base(api_url)) if api_url else None
+        self.bot = Bot(token=token, session=session)
+        self.chat_id = chat_id
+        self.min_interval = min_interval
+        self.digest_window = digest_window
+        self._queue = asyncio.Queue()
+        self._task = None
+        self._next_send = 0.0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='telegram-sender')
+
+    def submit(self, text):
+        """Поставить сообщение в очередь; future завершится True/False после доставки"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future))
+        return future
+
+    async def send(self, text):
+        """Отправить сообщение и дождаться результата доставки"""
+        return await self.submit(text)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    async def drain(self):
+        """Дождаться отправки всех сообщений из очереди"""
+        await self._queue.join()
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_result(False)
+        await self.bot.session.close()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            if self.digest_window > 0:
+                deadline = loop.time() + self.digest_window
+                while (timeout := deadline - loop.time()) > 0:
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+            delivered = True
+            for message in self._compose([text for text, _ in batch]):
+                delivered = await self._deliver(message) and delivered
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(delivered)
+                self._queue.task_done()
+
+    @staticmethod
+    def _compose(texts):
+        """Одно сообщение как есть, несколько — дайджест, разбитый по лимиту длины"""
+        if len(texts) == 1:
+            return [texts[0][:MAX_MESSAGE_LENGTH]]
+        messages = []
+        current = f"Новые лоты ({len(texts)}):"
+        for text in texts:
+            line = f"\n• {text}"
+            if len(current) + len(line) > MAX_MESSAGE_LENGTH:
+                messages.append(current)
+                current = line.lstrip('\n')
+            else:
+                current += line
+        messages.append(current)
+        return messages
+
+    async def _deliver(self, text):
+        loop = asyncio.get_running_loop()
+        for _ in range(MAX_ATTEMPTS):
+            delay = self._next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_send = loop.time() + self.min_interval
+            try:
+                with STAGE_SECONDS.time(stage='telegram'):
+                    await self.bot.send_message(chat_id=self.chat_id, text=text)
+                print(f"✓ Отправлено в Telegram: {text[:50]}...")
+                return True
+            except TelegramRetryAfter as e:
+                print(f"⚠ Flood control Telegram, ждём {e.retry_after} с")
+                self._next_send = loop.time() + e.retry_after
+            except TelegramBadRequest as e:
+                print(f"✗ Ошибка Telegram: {e}")
+                return False
+            except Exception as e:
+                print(f"✗ Ошибка отправки в Telegram: {e}")
+                return False
+        return False
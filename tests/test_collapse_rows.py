@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('selenium')
+
+from parser_fedresurs import collapse_rows, rows_to_trades, deduplicate_trades  # noqa: E402
+
+TODAY = datetime.now().strftime('%d.%m.%Y')
+G1 = '11111111-1111-1111-1111-111111111111'
+G2 = '22222222-2222-2222-2222-222222222222'
+
+
+def row(url='', links=None, **fields):
+    result = {'debtor_name': '', 'lot_number': '', 'description': '', 'publish_date': '', 'arbitr_manager': ''}
+    result.update(fields)
+    result['links'] = links if links is not None else ([url] if url else [])
+    result['url'] = result['links'][0] if result['links'] else ''
+    return result
+
+
+def trades_from(rows):
+    return deduplicate_trades(rows_to_trades(collapse_rows(rows), 'Иванов'))
+
+
+def test_trade_row_with_cells_is_kept():
+    # Строка trade-row с ячейками trade-row__cell: ячейки тоже совпадают с селектором строк
+    rows = [
+        row(f'https://x/bidding/{G1}', debtor_name='ООО А', lot_number='Лот № 1', publish_date=TODAY),
+        row(debtor_name='ООО А'),
+        row(f'https://x/bidding/{G1}'),
+        row(f'https://x/bidding/{G2}', debtor_name='ООО Б', lot_number='Лот № 2', publish_date=TODAY),
+        row(debtor_name='ООО Б'),
+        row(f'https://x/bidding/{G2}'),
+    ]
+    trades = trades_from(rows)
+    assert [trade['guid'] for trade in trades] == [G1, G2]
+    assert trades[0]['debtor_name'] == 'ООО А'
+
+
+def test_list_container_is_dropped():
+    links = [f'https://x/bidding/{G1}', f'https://x/bidding/{G2}']
+    rows = [
+        row(links=links, debtor_name='ООО А', lot_number='Лот № 1', publish_date=TODAY),
+        row(links[0], debtor_name='ООО А', lot_number='Лот № 1', publish_date=TODAY),
+        row(lot_number='Лот № 1'),
+        row(links[1], debtor_name='ООО Б', lot_number='Лот № 2', publish_date=TODAY),
+        row(lot_number='Лот № 2'),
+    ]
+    assert [trade['guid'] for trade in trades_from(rows)] == [G1, G2]
+
+
+def test_guidless_rows_and_their_fields():
+    rows = [
+        row(debtor_name='ООО В', lot_number='Лот № 3', publish_date=TODAY),
+        row(debtor_name='ООО В'),
+        row(debtor_name='ООО Г', lot_number='Лот № 4', publish_date=TODAY),
+        row(lot_number='Лот № 4'),
+    ]
+    trades = trades_from(rows)
+    assert [trade['debtor_name'] for trade in trades] == ['ООО В', 'ООО Г']
+    assert all(trade['guid'] == '' for trade in trades)
+
+
+def test_card_links_are_not_lot_guids():
+    # Ссылки на карточки управляющего и должника содержат UUID, но это не торги
+    manager = 'https://x/arbitrmanagers/33333333-3333-3333-3333-333333333333'
+    person = 'https://x/persons/44444444-4444-4444-4444-444444444444'
+    rows = [
+        row(links=[f'https://x/bidding?guid={G1}', manager], debtor_name='ООО А', lot_number='Лот № 1',
+            publish_date=TODAY),
+        row(links=[f'https://x/bidding/{G2}', manager], debtor_name='ООО А', lot_number='Лот № 2',
+            publish_date=TODAY),
+    ]
+    assert [trade['guid'] for trade in trades_from(rows)] == [G1, G2]
+
+
+def test_guid_taken_from_trade_link_not_first_link():
+    # Первая ссылка строки — карточка должника; ячейка лота внутри строки даёт тот же GUID
+    person = 'https://x/persons/44444444-4444-4444-4444-444444444444'
+    lot_link = f'https://x/bidding?guid={G1}'
+    rows = [
+        row(links=[person, lot_link], debtor_name='ООО А', lot_number='Лот № 1', publish_date=TODAY),
+        row(lot_link, lot_number='Лот № 1'),
+        row(links=[person, f'https://x/bidding?guid={G2}'], debtor_name='ООО А', lot_number='Лот № 2',
+            publish_date=TODAY),
+    ]
+    trades = trades_from(rows)
+    assert [(trade['guid'], trade['url']) for trade in trades] == [(G1, lot_link), (G2, f'https://x/bidding?guid={G2}')]
+
+
+def test_rows_that_cannot_be_fingerprinted_are_dropped():
+    rows = [
+        # Пункт меню с классом trades-menu: только ссылка
+        row('https://x/trades'),
+        # Подпись фильтра: «дата» без даты
+        row(publish_date='Дата публикации', lot_number='Лот'),
+        # Дата без номера лота и должника
+        row(publish_date=TODAY, description='Описание'),
+        row(debtor_name='ООО Д', publish_date=TODAY),
+    ]
+    assert [trade['debtor_name'] for trade in trades_from(rows)] == ['ООО Д']
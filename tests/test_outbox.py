@@ -0,0 +1,50 @@
+import time
+
+from outbox import Outbox
+
+
+def make_outbox(**kwargs):
+    saved = []
+    completed = []
+    outbox = Outbox(lambda: {}, lambda data: saved.append(data), on_complete=completed.append, **kwargs)
+    return outbox, completed
+
+
+def test_in_flight_channel_is_not_resubmitted():
+    outbox, completed = make_outbox(backoff_base=30, backoff_max=3600)
+    outbox.add({'guid': 'g1'}, ['telegram'])
+    outbox.begin('g1', 'telegram')
+
+    # Пауза истекла, а результат попытки ещё не пришёл — повтор дал бы дубликат
+    later = time.time() + 60
+    assert not outbox.is_due('g1', 'telegram', now=later)
+    assert outbox.due_lots(now=later) == []
+
+    outbox.finish('g1', 'telegram', True)
+    assert 'g1' not in outbox
+    assert completed == ['g1']
+
+
+def test_failed_attempt_is_retried_after_backoff():
+    outbox, _ = make_outbox(backoff_base=30, backoff_max=3600)
+    outbox.add({'guid': 'g1'}, ['email'])
+    outbox.begin('g1', 'email')
+    outbox.finish('g1', 'email', False)
+
+    assert not outbox.is_due('g1', 'email')
+    assert outbox.is_due('g1', 'email', now=time.time() + 31)
+    assert [lot['guid'] for lot in outbox.due_lots(now=time.time() + 31)] == ['g1']
+
+
+def test_lost_result_is_retried_after_backoff_max():
+    outbox, _ = make_outbox(backoff_base=30, backoff_max=120)
+    outbox.add({'guid': 'g1'}, ['telegram'])
+    outbox.begin('g1', 'telegram')
+    assert outbox.is_due('g1', 'telegram', now=time.time() + 121)
+
+
+def test_lot_without_channels_is_completed():
+    outbox, completed = make_outbox()
+    outbox.add({'guid': 'g1'}, [])
+    assert 'g1' not in outbox
+    assert completed == ['g1']
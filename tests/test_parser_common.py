@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def test_http_parser_does_not_import_selenium():
+    # HTTP-бэкенд должен запускаться без установленного selenium
+    code = (
+        "import sys, parser_fedresurs_http; "
+        "sys.exit(any(name.split('.')[0] == 'selenium' for name in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,54 @@
+import pytest
+
+import scheduler
+from scheduler import PollScheduler
+from trustee_state import TrusteeState
+
+NAMES = ['Иванов', 'Петров', 'Сидоров']
+NOW = 1_800_000_000.0
+
+
+@pytest.fixture
+def state(tmp_path):
+    return TrusteeState(str(tmp_path / 'state.json'))
+
+
+def test_budget_limits_searches_per_minute(state):
+    poll = PollScheduler(NAMES, state, budget=2)
+    assert poll.due(NOW) == ['Иванов', 'Петров']
+    assert poll.due(NOW + 30) == []
+    # Через минуту окно освобождается
+    assert poll.due(NOW + 61) == ['Иванов', 'Петров']
+
+
+def test_fractional_budget_still_polls(state):
+    # 0.5 поиска в минуту — один поиск в две минуты, а не ни одного
+    poll = PollScheduler(NAMES, state, budget=0.5)
+    assert poll.due(NOW) == ['Иванов']
+    assert poll.due(NOW + 61) == []
+    assert poll.due(NOW + 121) == ['Иванов']
+
+
+def test_overdue_first_and_not_before_next_poll(state):
+    state.update('Иванов', next_poll_at=NOW + 100)
+    state.update('Петров', next_poll_at=NOW - 50)
+    state.update('Сидоров', next_poll_at=NOW - 10)
+    poll = PollScheduler(NAMES, state, budget=10)
+    assert poll.due(NOW) == ['Петров', 'Сидоров']
+
+
+def test_failures_back_off(state, monkeypatch):
+    monkeypatch.setattr(scheduler, 'JITTER', 0)
+    poll = PollScheduler(['Иванов'], state, budget=0)
+    poll.record_poll('Иванов', ok=True, now=NOW)
+    base = state.get('Иванов', 'next_poll_at') - NOW
+    poll.record_poll('Иванов', ok=False, now=NOW)
+    poll.record_poll('Иванов', ok=False, now=NOW)
+    assert state.get('Иванов', 'failures') == 2
+    assert state.get('Иванов', 'next_poll_at') - NOW == pytest.approx(min(base * 4, max(scheduler.MAX_INTERVAL, base)))
+
+
+def test_publication_days_are_deduplicated(state):
+    poll = PollScheduler(['Иванов'], state, budget=0)
+    poll.record_poll('Иванов', ['01.03.2026', '01.03.2026', '03.03.2026'], now=NOW)
+    assert state.get('Иванов', 'publications') == ['01.03.2026', '03.03.2026']
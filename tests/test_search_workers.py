@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+pytest.importorskip('selenium')
+
+import parser_fedresurs  # noqa: E402
+
+
+class FakePool:
+    def __init__(self, broken=0):
+        self.lock = threading.Lock()
+        self.acquired = 0
+        self.released = 0
+        # Столько первых запросов драйвера заканчиваются неудачей
+        self.broken = broken
+
+    def acquire(self):
+        with self.lock:
+            if self.broken:
+                self.broken -= 1
+                return None
+            self.acquired += 1
+            return object()
+
+    def release(self, driver):
+        with self.lock:
+            self.released += 1
+
+
+def run_workers(monkeypatch, pool, names, concurrency):
+    monkeypatch.setattr(parser_fedresurs, 'get_driver_pool', lambda: pool)
+    monkeypatch.setattr(parser_fedresurs, 'search_trades_by_trustee',
+                        lambda driver, name, throttle, known_guids, failed: [name])
+    results, failed = [], []
+    parser_fedresurs._run_search_workers(names, concurrency, lambda name, trades: results.append(name),
+                                         failed=failed)
+    return results, failed
+
+
+def test_driver_is_acquired_per_search(monkeypatch):
+    pool = FakePool()
+    names = [f'Управляющий {i}' for i in range(5)]
+    results, failed = run_workers(monkeypatch, pool, names, 2)
+    assert sorted(results) == sorted(names)
+    # DRIVER_MAX_USES и RSS считаются на каждый поиск, а не на сессию потока
+    assert pool.acquired == pool.released == 5
+    assert failed == []
+
+
+def test_trustee_goes_back_to_queue_when_driver_fails(monkeypatch):
+    pool = FakePool(broken=1)
+    names = [f'Управляющий {i}' for i in range(4)]
+    results, failed = run_workers(monkeypatch, pool, names, 2)
+    assert sorted(results) == sorted(names)
+    assert failed == []
+
+
+def test_trustees_fail_when_no_driver_starts(monkeypatch):
+    pool = FakePool(broken=10)
+    names = ['А', 'Б']
+    results, failed = run_workers(monkeypatch, pool, names, 2)
+    assert results == []
+    assert sorted(failed) == names
@@ -0,0 +1,42 @@
+import sqlite3
+
+from seen_store import SeenStore, LotClaims
+
+
+def test_evicts_only_lots_published_before_min_date(tmp_path):
+    store = SeenStore(str(tmp_path / 'seen.db'))
+    store.add('old', '01.01.2026')
+    store.add('recent', '01.03.2026')
+    store.add('undated')
+    assert store.evict_published_before('2026-02-22') == 1
+    assert 'old' not in store
+    # Лот, который ещё проходит фильтр даты, остаётся известным сколько угодно долго
+    assert 'recent' in store and 'undated' in store
+    store.close()
+
+
+def test_old_database_gets_publish_date_column(tmp_path):
+    path = str(tmp_path / 'seen.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE seen (guid TEXT PRIMARY KEY, seen_at REAL NOT NULL) WITHOUT ROWID')
+    conn.execute("INSERT INTO seen VALUES ('g1', 0)")
+    conn.commit()
+    conn.close()
+
+    store = SeenStore(path)
+    assert 'g1' in store
+    assert store.evict_published_before('2030-01-01') == 0
+    assert 'g1' in store
+    store.close()
+
+
+def test_claims_evict_only_done_lots_before_min_date(tmp_path):
+    claims = LotClaims(str(tmp_path / 'claims.db'), 'owner')
+    claims.claim('done-old', {'guid': 'done-old'}, '01.01.2026')
+    claims.claim('open-old', {'guid': 'open-old'}, '01.01.2026')
+    claims.claim('done-recent', {'guid': 'done-recent'}, '01.03.2026')
+    claims.complete('done-old')
+    claims.complete('done-recent')
+    assert claims.evict_published_before('2026-02-22') == 1
+    assert not claims.claim('done-recent')
+    claims.close()
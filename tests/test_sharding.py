@@ -0,0 +1,11 @@
+from sharding import shard_path
+
+
+def test_single_instance_keeps_plain_paths():
+    assert shard_path('pending_lots.json', 0, 1) == 'pending_lots.json'
+
+
+def test_shards_get_their_own_state_files():
+    assert shard_path('seen_cases.db', 1, 3) == 'seen_cases.shard1.db'
+    assert shard_path('state/trustee_state.json', 2, 3) == 'state/trustee_state.shard2.json'
+    assert shard_path('seen_cases.db', 0, 2) != shard_path('seen_cases.db', 1, 2)
@@ -0,0 +1,71 @@
+import smtplib
+
+import pytest
+
+from smtp_client import SMTPClient
+
+
+class FakeServer:
+    """Соединение, которое выполняет сценарий: по одному исключению (или None) на вызов sendmail"""
+
+    def __init__(self, outcomes, calls):
+        self.outcomes = outcomes
+        self.calls = calls
+        self.data_started = False
+
+    def sendmail(self, from_addr, to_addrs, message):
+        self.calls.append(message)
+        outcome = self.outcomes.pop(0)
+        if outcome is None:
+            return {}
+        error, after_data = outcome
+        self.data_started = after_data
+        raise error
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_client(outcomes):
+    client = SMTPClient('localhost', 25)
+    calls = []
+
+    def ensure_connected():
+        if client._server is None:
+            client._server = FakeServer(outcomes, calls)
+            client.handshakes += 1
+
+    client._ensure_connected = ensure_connected
+    return client, calls
+
+
+def test_reconnects_when_disconnected_before_data():
+    client, calls = make_client([(smtplib.SMTPServerDisconnected('closed'), False), None])
+    client.send('a@example.com', ['b@example.com'], 'письмо')
+    assert len(calls) == 2
+    assert client.handshakes == 2
+    client.close()
+
+
+def test_no_resend_when_disconnected_after_data():
+    client, calls = make_client([(smtplib.SMTPServerDisconnected('closed'), True), None])
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        client.send('a@example.com', ['b@example.com'], 'письмо')
+    assert len(calls) == 1
+    client.close()
+
+
+@pytest.mark.parametrize('error', [
+    smtplib.SMTPRecipientsRefused({'b@example.com': (550, b'no such user')}),
+    smtplib.SMTPDataError(554, b'rejected'),
+    TimeoutError('timed out'),
+])
+def test_server_errors_and_timeouts_are_not_retried(error):
+    client, calls = make_client([(error, False), None])
+    with pytest.raises(type(error)):
+        client.send('a@example.com', ['b@example.com'], 'письмо')
+    assert len(calls) == 1
+    client.close()
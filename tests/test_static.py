@@ -0,0 +1,39 @@
+"""
+Статическая проверка: pyflakes по всем модулям проекта и бенчмаркам.
+Падает на ошибках, из-за которых код не работает (неопределённые имена, синтаксис),
+предупреждения о неиспользуемых импортах не учитываются.
+"""
+
+import glob
+import os
+
+import pytest
+from pyflakes import api, messages
+from pyflakes.reporter import Reporter
+
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+FILES = sorted(glob.glob(os.path.join(ROOT, '*.py')) + glob.glob(os.path.join(ROOT, 'benchmarks', '*.py')))
+ERRORS = (messages.UndefinedName, messages.UndefinedLocal, messages.UndefinedExport, messages.ReturnOutsideFunction)
+
+
+class _Collector(Reporter):
+    def __init__(self):
+        self.errors = []
+
+    def unexpectedError(self, filename, message):
+        self.errors.append(f'{filename}: {message}')
+
+    def syntaxError(self, filename, message, lineno, offset, text):
+        self.errors.append(f'{filename}:{lineno}: {message}')
+
+    def flake(self, message):
+        if isinstance(message, ERRORS):
+            self.errors.append(str(message))
+
+
+@pytest.mark.parametrize('path', FILES, ids=[os.path.relpath(path, ROOT) for path in FILES])
+def test_pyflakes(path):
+    reporter = _Collector()
+    api.checkPath(path, reporter)
+    assert not reporter.errors, '\n'.join(reporter.errors)
@@ -0,0 +1,26 @@
+from trustee_index import TrusteeIndex, name_variants, normalize_name
+
+
+def test_normalize_name():
+    assert normalize_name('Мурдашёва А.И.') == 'мурдашева а и'
+
+
+def test_name_variants():
+    assert name_variants('Мурдашева Алсу Ишбулатовна') == {
+        'мурдашева алсу ишбулатовна', 'алсу ишбулатовна мурдашева', 'мурдашева а и', 'а и мурдашева',
+    }
+
+
+def test_match_variants_and_whole_words():
+    index = TrusteeIndex(['Мурдашева Алсу Ишбулатовна', 'Иванов Иван Иванович'])
+    assert index.match('Арбитражный управляющий: Мурдашева А.И.') == ['Мурдашева Алсу Ишбулатовна']
+    assert index.match('И. И. Иванов; Алсу Ишбулатовна Мурдашева') == [
+        'Иванов Иван Иванович', 'Мурдашева Алсу Ишбулатовна',
+    ]
+    # Фамилия внутри другого слова — не совпадение
+    assert index.match('Ивановский И.И.') == []
+
+
+def test_namesakes_with_same_initials():
+    index = TrusteeIndex(['Иванов Иван Иванович', 'Иванов Игорь Ильич'])
+    assert sorted(index.match('Иванов И.И.')) == ['Иванов Иван Иванович', 'Иванов Игорь Ильич']
@@ -0,0 +1,39 @@
+import json
+
+from trustee_state import TrusteeState
+
+
+def test_staged_fields_apply_only_to_committed_trustees(tmp_path):
+    state = TrusteeState(str(tmp_path / 'state.json'))
+    state.stage('Иванов', high_water={'guid': 'a'}, page_fingerprint='f1')
+    state.stage('Петров', high_water={'guid': 'b'})
+    assert state.get('Иванов', 'high_water') is None
+
+    state.commit(['Иванов'])
+    assert state.get('Иванов', 'high_water') == {'guid': 'a'}
+    assert state.get('Иванов', 'page_fingerprint') == 'f1'
+    # Отложенное для неуспешного управляющего отброшено, а не перенесено на следующий опрос
+    assert state.get('Петров', 'high_water') is None
+    state.commit()
+    assert state.get('Петров', 'high_water') is None
+
+
+def test_one_write_per_flush(tmp_path, monkeypatch):
+    path = tmp_path / 'state.json'
+    state = TrusteeState(str(path))
+    saves = []
+    save = state._save
+    monkeypatch.setattr(state, '_save', lambda: (saves.append(1), save()))
+
+    for name in ('Иванов', 'Петров'):
+        state.stage(name, high_water={'guid': name})
+        state.update(name, failures=0)
+        state.update(name, next_poll_at=1.0)
+    state.commit(['Иванов', 'Петров'])
+    assert not path.exists()
+
+    state.flush()
+    state.flush()
+    assert len(saves) == 1
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert data['Петров'] == {'high_water': {'guid': 'Петров'}, 'failures': 0, 'next_poll_at': 1.0}
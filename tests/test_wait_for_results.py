@@ -0,0 +1,61 @@
+"""Ожидание результатов поиска (parser_fedresurs.wait_for_results) на поддельном драйвере"""
+
+import pytest
+
+pytest.importorskip('selenium')
+
+import parser_fedresurs  # noqa: E402
+from parser_fedresurs import wait_for_results  # noqa: E402
+
+
+class FakeDriver:
+    """Отдаёт состояния READINESS_JS по очереди, последнее повторяется"""
+
+    def __init__(self, states):
+        self.states = list(states)
+
+    def execute_script(self, script, *args):
+        if script is parser_fedresurs.INSTALL_OBSERVER_JS:
+            return None
+        return self.states.pop(0) if len(self.states) > 1 else self.states[0]
+
+
+def state(**overrides):
+    base = {'observed': True, 'pending': 0, 'rows': 3, 'empty': False, 'mutated': False, 'quiet_ms': 10000}
+    base.update(overrides)
+    return base
+
+
+@pytest.fixture(autouse=True)
+def fast_poll(monkeypatch):
+    monkeypatch.setattr(parser_fedresurs, 'RESULTS_POLL_INTERVAL', 0)
+
+
+def test_stale_page_after_click_is_not_ready():
+    driver = FakeDriver([state()])
+    reason, _ = wait_for_results(driver, timeout=0.05, quiet=0.1, after_click=True)
+    assert reason == 'timeout'
+
+
+def test_mutation_after_click_is_ready():
+    driver = FakeDriver([state(), state(mutated=True)])
+    reason, _ = wait_for_results(driver, timeout=1, quiet=0.1, after_click=True)
+    assert reason == 'stable'
+
+
+def test_navigation_after_click_is_ready():
+    driver = FakeDriver([state(), state(observed=False), state()])
+    reason, _ = wait_for_results(driver, timeout=1, quiet=0.1, after_click=True)
+    assert reason == 'stable'
+
+
+def test_pending_requests_hold_readiness():
+    driver = FakeDriver([state(pending=1, mutated=True)])
+    reason, _ = wait_for_results(driver, timeout=0.05, quiet=0.1)
+    assert reason == 'timeout'
+
+
+def test_loaded_page_without_click_is_ready():
+    driver = FakeDriver([state()])
+    reason, _ = wait_for_results(driver, timeout=1, quiet=0.1)
+    assert reason == 'stable'
@@ -0,0 +1,161 @@
+"""
+История найденных торгов на SQLite (только добавление)
+Каждый торг записывается один раз — при первом обнаружении, по ключу лота (GUID или отпечаток);
+изменение и удаление строк запрещены триггерами. Индексы по управляющему, дате публикации и GUID
+позволяют считать и выбирать торги за период, не загружая историю в память.
+
+    python trade_history.py count [--trustee ИМЯ] [--since ГГГГ-ММ-ДД] [--until ГГГГ-ММ-ДД]
+    python trade_history.py by-trustee [--since ...] [--until ...]
+    python trade_history.py by-day [--trustee ...] [--since ...] [--until ...]
+    python trade_history.py list [--trustee ...] [--since ...] [--until ...] [--limit 20]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from seen_store import lot_key, iso_date
+
+
+TRADE_HISTORY_DB = os.getenv('TRADE_HISTORY_DB', 'trade_history.db')
+
+# Поля торга, которые сохраняются в истории (кроме ключа, даты и времени обнаружения)
+TRADE_FIELDS = ('guid', 'trustee_name', 'debtor_name', 'lot_number', 'description', 'url')
+
+
+class TradeHistory:
+    """Журнал торгов: append() из цикла парсинга, count()/count_by()/iter_trades() для анализа"""
+
+    def __init__(self, path=TRADE_HISTORY_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS trades ('
+            'id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, guid TEXT, trustee_name TEXT NOT NULL, '
+            'publish_date TEXT, debtor_name TEXT, lot_number TEXT, description TEXT, url TEXT, '
+            'found_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS trades_trustee_date_idx ON trades (trustee_name, publish_date)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS trades_date_idx ON trades (publish_date)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS trades_guid_idx ON trades (guid)')
+        for action in ('UPDATE', 'DELETE'):
+            self._conn.execute(
+                f'CREATE TRIGGER IF NOT EXISTS trades_no_{action.lower()} BEFORE {action} ON trades '
+                "BEGIN SELECT RAISE(ABORT, 'история торгов только дополняется'); END"
+            )
+
+    def append(self, trades):
+        """Записать торги одной транзакцией; уже известные пропускаются. Возвращает число новых"""
+        now = time.time()
+        rows = [
+            (lot_key(trade), iso_date(trade.get('publish_date')), now, *(trade.get(field) or '' for field in TRADE_FIELDS))
+            for trade in trades
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO trades (key, publish_date, found_at, {', '.join(TRADE_FIELDS)}) "
+                    f"VALUES (?, ?, ?, {', '.join('?' for _ in TRADE_FIELDS)})", rows
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+            return self._conn.total_changes - before
+
+    @staticmethod
+    def _where(trustee=None, since=None, until=None):
+        """Условие отбора по управляющему и диапазону дат публикации (включительно)"""
+        clauses, params = [], []
+        if trustee:
+            clauses.append('trustee_name = ?')
+            params.append(trustee)
+        if since:
+            clauses.append('publish_date >= ?')
+            params.append(iso_date(since) or since)
+        if until:
+            clauses.append('publish_date <= ?')
+            params.append(iso_date(until) or until)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def count(self, trustee=None, since=None, until=None):
+        where, params = self._where(trustee, since, until)
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM trades{where}', params).fetchone()[0]
+
+    def count_by(self, group, trustee=None, since=None, until=None):
+        """Число торгов по управляющим ('trustee') или по дням публикации ('day')"""
+        column = {'trustee': 'trustee_name', 'day': 'publish_date'}[group]
+        where, params = self._where(trustee, since, until)
+        with self._lock:
+            return self._conn.execute(
+                f'SELECT {column}, COUNT(*) FROM trades{where} GROUP BY {column} ORDER BY {column}', params
+            ).fetchall()
+
+    def iter_trades(self, trustee=None, since=None, until=None, limit=None):
+        """Торги от новых к старым по дате публикации; строки читаются курсором по мере обхода"""
+        where, params = self._where(trustee, since, until)
+        query = (
+            f"SELECT key, publish_date, found_at, {', '.join(TRADE_FIELDS)} FROM trades{where} "
+            'ORDER BY publish_date DESC, id DESC'
+        )
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        # Отдельное соединение: долгий обход не блокирует запись из цикла парсинга
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(query, params)
+            columns = [description[0] for description in cursor.description]
+            for row in cursor:
+                yield dict(zip(columns, row))
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Запросы к истории найденных торгов')
+    parser.add_argument('command', choices=('count', 'by-trustee', 'by-day', 'list'))
+    parser.add_argument('--db', default=TRADE_HISTORY_DB)
+    parser.add_argument('--trustee', help='управляющий (точное имя)')
+    parser.add_argument('--since', help='дата публикации от (ГГГГ-ММ-ДД или ДД.ММ.ГГГГ)')
+    parser.add_argument('--until', help='дата публикации до, включительно')
+    parser.add_argument('--limit', type=int, help='не больше стольких торгов (для list)')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"✗ Нет файла истории {args.db}")
+        return 1
+    history = TradeHistory(args.db)
+    try:
+        if args.command == 'count':
+            print(history.count(args.trustee, args.since, args.until))
+        elif args.command in ('by-trustee', 'by-day'):
+            for name, count in history.count_by(args.command[3:], args.trustee, args.since, args.until):
+                print(f"{name or '—'}\t{count}")
+        else:
+            # JSON Lines: вывод можно направить в файл или jq, не загружая историю в память
+            for trade in history.iter_trades(args.trustee, args.since, args.until, args.limit):
+                sys.stdout.write(json.dumps(trade, ensure_ascii=False) + '\n')
+    finally:
+        history.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
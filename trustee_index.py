@@ -0,0 +1,102 @@
+"""
+Индекс имён арбитражных управляющих для широких запросов
+Имена нормализуются (регистр, ё/е, знаки препинания), для каждого строятся варианты
+с инициалами и другим порядком слов; поиск всех вариантов в тексте строки — за один
+проход автоматом Ахо — Корасик, независимо от числа управляющих.
+"""
+
+import re
+from collections import deque
+
+
+_NON_LETTERS = re.compile(r'[^a-zа-я0-9]+')
+
+
+def normalize_name(text):
+    """'Мурдашева А.И.' -> 'мурдашева а и'"""
+    text = (text or '').lower().replace('ё', 'е')
+    return _NON_LETTERS.sub(' ', text).strip()
+
+
+def name_variants(full_name):
+    """
+    Написания имени: 'фамилия имя отчество', 'имя отчество фамилия',
+    'фамилия и о', 'и о фамилия' (для имени без отчества — те же без него)
+    """
+    words = normalize_name(full_name).split()
+    if len(words) < 2:
+        return {' '.join(words)} if words else set()
+    surname, given = words[0], words[1:]
+    initials = [word[0] for word in given]
+    return {
+        ' '.join([surname] + given),
+        ' '.join(given + [surname]),
+        ' '.join([surname] + initials),
+        ' '.join(initials + [surname]),
+    }
+
+
+def load_trustee_names(path):
+    """Управляющие из текстового файла: по одному на строку, пустые строки и '#' пропускаются"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+class AhoCorasick:
+    """Поиск всех вхождений набора строк в тексте за один проход"""
+
+    def __init__(self, patterns):
+        """patterns — словарь {строка: значение}"""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for pattern, value in patterns.items():
+            node = 0
+            for char in pattern:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._output[node].append(value)
+
+        # Ссылки неудачи обходом в ширину (у детей корня — корень); выходы наследуются по ссылкам
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def search(self, text):
+        """Значения всех найденных строк (с повторами)"""
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            yield from self._output[node]
+
+
+class TrusteeIndex:
+    """Сопоставление произвольного текста (поле управляющего, вся строка торга) с известными управляющими"""
+
+    def __init__(self, trustee_names):
+        patterns = {}
+        for name in trustee_names:
+            for variant in name_variants(name):
+                # Пробелы по краям — совпадение только целыми словами;
+                # одинаковые инициалы у однофамильцев дают несколько управляющих
+                patterns.setdefault(f' {variant} ', []).append(name)
+        self.trustee_names = list(trustee_names)
+        self._matcher = AhoCorasick({pattern: tuple(names) for pattern, names in patterns.items()})
+
+    def match(self, text):
+        """Управляющие, упомянутые в тексте, в порядке первого упоминания"""
+        found = dict.fromkeys(name for names in self._matcher.search(f' {normalize_name(text)} ') for name in names)
+        return list(found)
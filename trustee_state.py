@@ -0,0 +1,83 @@
+"""
+Состояние парсера по управляющим между запусками
+Хранится в JSON: отметка последнего увиденного торга и другие поля по управляющему.
+Изменения копятся в памяти и пишутся на диск одним flush() за опрос; отметки парсера
+(stage) применяются только после commit(), когда найденные торги уже обработаны
+"""
+
+import json
+import os
+import threading
+
+from sharding import shard_path
+
+
+# У каждого шарда свой файл (см. sharding.shard_path)
+TRUSTEE_STATE_FILE = os.getenv('TRUSTEE_STATE_FILE', shard_path('trustee_state.json'))
+
+
+class TrusteeState:
+    """Словарь {управляющий: {поле: значение}} с атомарной записью на диск"""
+
+    def __init__(self, path=TRUSTEE_STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {}
+        self._staged = {}
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Не удалось прочитать {path}: {e}")
+
+    def get(self, trustee_name, field, default=None):
+        with self._lock:
+            return self._data.get(trustee_name, {}).get(field, default)
+
+    def update(self, trustee_name, **fields):
+        """Обновить поля управляющего; на диск — при flush()"""
+        with self._lock:
+            self._data.setdefault(trustee_name, {}).update(fields)
+            self._dirty = True
+
+    def stage(self, trustee_name, **fields):
+        """Отложить поля до commit(): get() до тех пор возвращает прежние значения"""
+        with self._lock:
+            self._staged.setdefault(trustee_name, {}).update(fields)
+
+    def commit(self, trustee_names=None):
+        """Применить отложенные поля этих управляющих (None — всех); отложенное для остальных отбрасывается"""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+            for trustee_name, fields in staged.items():
+                if trustee_names is None or trustee_name in trustee_names:
+                    self._data.setdefault(trustee_name, {}).update(fields)
+                    self._dirty = True
+
+    def flush(self):
+        """Сохранить файл, если с прошлого сохранения что-то изменилось"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+                self._dirty = False
+
+    def _save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+_trustee_state = None
+_trustee_state_lock = threading.Lock()
+
+
+def get_trustee_state():
+    """Общее состояние процесса"""
+    global _trustee_state
+    with _trustee_state_lock:
+        if _trustee_state is None:
+            _trustee_state = TrusteeState()
+        return _trustee_state